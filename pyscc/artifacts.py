@@ -0,0 +1,102 @@
+# Licensed to the Software Freedom Conservancy (SFC) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The SFC licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import logging
+import os
+import threading
+import zipfile
+from functools import wraps
+
+from selenium.common.exceptions import WebDriverException
+from six import text_type
+from six.moves import queue
+
+
+class ArtifactWriter(object):
+    """
+    Writes artifact bundles as zip archives on a background thread.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = None
+        self.logger = logging.getLogger('pyscc')
+
+    def __work(self):
+        while True:
+            path, files = self.queue.get()
+            try:
+                directory = os.path.dirname(path)
+                if directory and not os.path.exists(directory):
+                    os.makedirs(directory)
+                with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as bundle:
+                    for name, content in files:
+                        # png data is already compressed
+                        bundle.writestr(name, content, zipfile.ZIP_STORED if \
+                            name.endswith('.png') else zipfile.ZIP_DEFLATED)
+            except Exception as exc: # pylint: disable=broad-except
+                self.logger.error('Could not write artifact bundle "%s": %s', path, exc)
+            finally:
+                self.queue.task_done()
+
+    def submit(self, path, files):
+        """
+        Queue a bundle to be written.
+
+        :param path: Path of the zip archive.
+        :type path: string
+        :param files: Names and contents of files to bundle, text is encoded as utf-8.
+        :type files: [(string, bytes or string), ...]
+        :return: string
+        """
+        files = [(name, content.encode('utf-8') if isinstance(content, text_type) else content)
+                 for name, content in files]
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.__work, name='pyscc-artifacts')
+            self.thread.daemon = True
+            self.thread.start()
+        self.queue.put((path, files))
+        return path
+
+    def flush(self):
+        """
+        Block until all queued bundles are written.
+        """
+        self.queue.join()
+
+
+def captures_failure(method):
+    """
+    Decorator for waits, captures a failure artifact bundle when the wait raises and the
+    controller's `_FAILURE_ARTIFACTS_` is set. The path of the bundle is attached to the
+    exception as `artifact_path`.
+
+    :return: callable
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):  # pylint: disable=missing-docstring
+        try:
+            return method(self, *args, **kwargs)
+        except (WebDriverException, RuntimeError) as exc:
+            controller = getattr(self, 'controller', self)
+            if controller._FAILURE_ARTIFACTS_ and getattr(exc, 'artifact_path', None) is None: # pylint: disable=protected-access
+                exc.artifact_path = controller.capture_failure(
+                    '{}.{}'.format(getattr(self, 'component', self).__class__.__name__,
+                                   method.__name__),
+                    getattr(getattr(self, 'component', None), '_', None), exc)
+            raise
+    return wrapper
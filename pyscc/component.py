@@ -15,11 +15,38 @@
 # specific language governing permissions and limitations
 # under the License.
 
+from six import add_metaclass, iteritems
+
 from pyscc.controller import Controller
-from pyscc.element import Element, Elements
+from pyscc.element import ComponentProperty, component_frame
 from pyscc.resource import Resource
 
 
+COMPONENT_KINDS = ('element', 'elements', 'group')
+
+
+class ComponentMeta(type):
+    """
+    Metaclass building the registry of element, elements, and group definitions
+    for each component class, inherited definitions included.
+    """
+    def __init__(cls, name, bases, attrs):
+        super(ComponentMeta, cls).__init__(name, bases, attrs)
+        registry = {}
+        for base in reversed(cls.__mro__[1:]):
+            registry.update(base.__dict__.get('__registry__', {}))
+        for attr, value in iteritems(attrs):
+            if isinstance(value, ComponentProperty):
+                registry[attr] = value.kind
+            else:
+                registry.pop(attr, None)
+        cls.__registry__ = registry
+        cls.__description__ = {kind: tuple(sorted(
+            attr for attr, attr_kind in iteritems(registry)
+            if attr_kind == kind and not attr.startswith('_'))) for kind in COMPONENT_KINDS}
+
+
+@add_metaclass(ComponentMeta)
 class Component(Resource): # pylint: disable=too-few-public-methods
     """
     Base resource for web components.
@@ -27,6 +54,9 @@ class Component(Resource): # pylint: disable=too-few-public-methods
     :param controller: Parent controller reference.
     :type controller: Controller
     """
+    __registry__ = {}  # definition name to kind, built by ComponentMeta
+    __description__ = {}  # sorted public definition names by kind, built by ComponentMeta
+
     def __init__(self, controller):
         self.controller = controller
         self.browser = controller.browser
@@ -37,21 +67,71 @@ class Component(Resource): # pylint: disable=too-few-public-methods
     def __describe__(self):
         """
         Fetch component description with attribute names for Element, Elements,
-        and Component Group instances.
+        and Component Group instances. Read from the class registry, no elements are constructed.
 
         :example: { 'element': [...], 'elements': [...], 'group': [...] }
         :return: dict
         """
-        # pylint: disable=line-too-long
-        expected_attributes = ['controller', 'browser', 'env', 'validate']
-        base_attributes = [child for child in dir(self) if not child.startswith('_') and child not in expected_attributes]
-        element_instances = [el for el in base_attributes if isinstance(getattr(self, el), Element)]
-        elements_instances = [el for el in base_attributes if isinstance(getattr(self, el), Elements)]
-        group_instances = [el for el in base_attributes if el not in element_instances + elements_instances and isinstance(getattr(self, el), Resource)]
-        return {
-            'element': element_instances,
-            'elements': elements_instances,
-            'group': group_instances
-        }
+        return {kind: list(attrs) for kind, attrs in iteritems(self.__description__)}
+
+    def __selectors__(self, samples=None):
+        """
+        Collect declared selectors with the component root applied, templates are filled
+        from the component's `__samples__` and the given samples.
+
+        :param samples: Placeholder values to fill selector templates with.
+        :type samples: dict
+        :return: ([(name, selector, frame), ...], [name, ...])
+        """
+        values = dict(getattr(self, '__samples__', None) or {})
+        values.update(samples or {})
+        frame = component_frame(self)
+        selectors = []
+        skipped = []
+        for name in sorted(self.__registry__):
+            definition = getattr(self, name)
+            if self.__registry__[name] == 'group':
+                elements = [('{}.{}'.format(name, element), getattr(definition, element)) \
+                    for element in definition.__group__]
+            else:
+                elements = [(name, definition)]
+            for element_name, element in elements:
+                template = element.template
+                if template.placeholders - set(values):
+                    skipped.append(element_name)
+                    continue
+                selectors.append((element_name, template.render(values), frame))
+        return selectors, skipped
+
+    def verify(self, samples=None, error=False):
+        """
+        Verify declared selectors match the current page in a single script.
+
+        :example: { 'selectors': { 'logo': { 'count': 1, ... } }, 'invalid': [], ... }
+        :param samples: Placeholder values to fill selector templates with.
+        :type samples: dict
+        :param error: Error upon invalid or unmatched selectors.
+        :type error: bool, string
+        :return: dict
+        """
+        selectors, skipped = self.__selectors__(samples)
+        report = self.controller.verify_selectors(selectors, error=error)
+        report['skipped'] = skipped
+        return report
+
+    def profile(self, samples=None, runs=20, top=None):
+        """
+        Rank declared selectors by the cost of looking them up in the current page.
+
+        :param samples: Placeholder values to fill selector templates with.
+        :type samples: dict
+        :param runs: Number of lookups per selector to average the lookup time over.
+        :type runs: int
+        :param top: Number of most expensive selectors to report, all by default.
+        :type top: int
+        :return: [dict, ...], most expensive first
+        """
+        return self.controller.profile_selectors(
+            self.__selectors__(samples)[0], runs=runs, top=top)
 
     meta = {'required_fields': [('controller', Controller)]}
@@ -0,0 +1,186 @@
+# Licensed to the Software Freedom Conservancy (SFC) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The SFC licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import errno
+import socket
+import threading
+import zlib
+
+from selenium.webdriver.remote import utils
+from selenium.webdriver.remote.errorhandler import ErrorCode
+from selenium.webdriver.remote.remote_connection import LOGGER, RemoteConnection
+from six.moves import http_client, queue
+from six.moves.urllib import parse
+
+
+STALE_ERRNOS = (errno.EPIPE, errno.ECONNRESET)  # send errors of connections closed by the server
+
+
+class PooledRemoteConnection(RemoteConnection): # pylint: disable=too-many-instance-attributes
+    """
+    Remote connection keeping a pool of keep-alive connections to the webdriver server,
+    commands issued concurrently each use their own connection up to the pool size.
+
+    :param remote_server_addr: Url of the webdriver server.
+    :type remote_server_addr: string
+    :param pool_size: Maximum number of connections, commands beyond it wait for a connection.
+    :type pool_size: int
+    :param connect_timeout: Time in seconds to wait for a connection to be established.
+    :type connect_timeout: int, float
+    :param read_timeout: Time in seconds to wait for a response.
+    :type read_timeout: int, float, None
+    :param compress: Accept gzip compressed responses, reducing transfer of large responses.
+    :type compress: bool
+    """
+    def __init__(self, remote_server_addr, pool_size=4, connect_timeout=10, read_timeout=None, # pylint: disable=too-many-arguments
+                 compress=False):
+        RemoteConnection.__init__(self, remote_server_addr, keep_alive=False, resolve_ip=False)
+        self.keep_alive = True
+        self.w3c = False  # set by the webdriver once a session is created
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.compress = compress
+        self.connections = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(pool_size)
+        self.lock = threading.Lock()
+        self.metrics = {'requests': 0, 'connections': 0, 'reused': 0, 'compressed': 0}
+
+    def __count(self, metric):
+        with self.lock:
+            self.metrics[metric] += 1
+
+    def __connect(self, parsed_url):
+        connection_type = http_client.HTTPSConnection if parsed_url.scheme == 'https' \
+            else http_client.HTTPConnection
+        connection = connection_type(
+            parsed_url.hostname, parsed_url.port, timeout=self.connect_timeout)
+        connection.connect()
+        connection.sock.settimeout(self.read_timeout)
+        self.__count('connections')
+        return connection
+
+    def __resend(self, connection, reused, error):
+        # commands are only resent when an idle connection was closed by the server before
+        # any response was received, timed out commands may have been processed
+        connection.close()
+        if not reused or isinstance(error, socket.timeout):
+            return False
+        if isinstance(error, http_client.BadStatusLine):
+            # no status line was received, python 3 raises RemoteDisconnected for it
+            return isinstance(error, getattr(http_client, 'RemoteDisconnected', ())) or \
+                error.line in ('', "''")
+        return getattr(error, 'errno', None) in STALE_ERRNOS
+
+    def __send(self, method, parsed_url, body, headers):
+        try:
+            connection, reused = self.connections.get_nowait(), True
+        except queue.Empty:
+            connection, reused = self.__connect(parsed_url), False
+        try:
+            connection.request(method, parsed_url.path, body, headers)
+        except (http_client.HTTPException, socket.error) as exc:
+            if not self.__resend(connection, reused, exc):
+                raise
+            return self.__send(method, parsed_url, body, headers)
+        try:
+            response = connection.getresponse()
+        except http_client.BadStatusLine as exc:
+            if not self.__resend(connection, reused, exc):
+                raise
+            return self.__send(method, parsed_url, body, headers)
+        except (http_client.HTTPException, socket.error):
+            connection.close()
+            raise
+        try:
+            data = response.read()
+        except (http_client.HTTPException, socket.error):
+            connection.close()
+            raise
+        if reused:
+            self.__count('reused')
+        if response.will_close:
+            connection.close()
+        else:
+            self.connections.put(connection)
+        return response, data
+
+    def _request(self, method, url, body=None):
+        LOGGER.debug('%s %s %s', method, url, body)
+        parsed_url = parse.urlparse(url)
+        headers = self.get_remote_connection_headers(parsed_url, True)
+        if self.compress:
+            headers['Accept-Encoding'] = 'gzip'
+        if body and method not in ('POST', 'PUT'):
+            body = None
+        self.__count('requests')
+        with self.slots:
+            response, data = self.__send(method, parsed_url, body, headers)
+        if response.getheader('Content-Encoding') == 'gzip':
+            data = zlib.decompress(data, 16 + zlib.MAX_WBITS)
+            self.__count('compressed')
+        LOGGER.debug('Finished Request')
+        if 300 <= response.status < 304:
+            return self._request('GET', response.getheader('location'))
+        return self.__parse(response.status, response.getheader('Content-Type'), data)
+
+    @staticmethod
+    def __parse(status, content_type, data):
+        body = data.decode('utf-8').replace('\x00', '').strip()
+        if 399 < status <= 500:
+            return {'status': status, 'value': body}
+        if content_type and any(
+                part.strip().startswith('image/png') for part in content_type.split(';')):
+            return {'status': 0, 'value': body}
+        try:
+            data = utils.load_json(body)
+        except ValueError:
+            return {'status': ErrorCode.SUCCESS if 199 < status < 300 else ErrorCode.UNKNOWN_ERROR,
+                    'value': body}
+        if 'value' not in data:
+            data['value'] = None
+        return data
+
+    def close(self):
+        """
+        Close all idle connections of the pool.
+        """
+        while True:
+            try:
+                self.connections.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def pool_connections(webdriver, **options):
+    """
+    Replace the command executor of a webdriver with a pooled keep-alive connection, commands
+    specific to the webdriver's executor are carried over.
+
+    :param webdriver: Webdriver to pool connections of.
+    :type webdriver: WebDriver
+    :param options: Options of the pooled connection.
+    :type options: dict
+    :return: WebDriver
+    """
+    executor = webdriver.command_executor
+    if isinstance(executor, PooledRemoteConnection):
+        return webdriver
+    pooled = PooledRemoteConnection(executor._url, **options)  # pylint: disable=protected-access
+    pooled._commands.update(executor._commands)  # pylint: disable=protected-access
+    pooled.w3c = getattr(executor, 'w3c', False)
+    webdriver.command_executor = pooled
+    return webdriver
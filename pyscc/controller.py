@@ -16,19 +16,36 @@
 # under the License.
 
 import io
+import json
 import logging
 import os
 import time
+import uuid
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 from string import Template
 from types import MethodType
 
-from pyseleniumjs import E2EJS
 from selenium.common.exceptions import InvalidSelectorException, \
-    NoSuchElementException, WebDriverException
+    NoSuchElementException, NoSuchFrameException, TimeoutException, WebDriverException
 from selenium.webdriver.remote.remote_connection import LOGGER as SeleniumLogger
-from six import iteritems, string_types
+from six import iteritems, string_types, text_type
+from six.moves.urllib.parse import urldefrag
 
+from pyscc import visual
+from pyscc.artifacts import ArtifactWriter, captures_failure
+from pyscc.connection import PooledRemoteConnection, pool_connections
+from pyscc.js import PysccJS
 from pyscc.resource import Resource
+from pyscc.scripts import NAVIGATION_MARK, NAVIGATION_STATE, NETWORK_IDLE, NETWORK_TRACKER, \
+    FAILURE_ARTIFACTS, LOCATION_CHANGE, SNAPSHOT, VERIFY_SELECTORS
+from pyscc.snapshot import Snapshot, SnapshotJS
+from pyscc.state import State
+from pyscc.stats import WaitStats
+from pyscc.tracer import Tracer, traced
+
+
+READY_STRATEGIES = ('dom', 'component', 'idle')
 
 
 class ControllerLogger(logging.Logger):
@@ -50,11 +67,27 @@ class ControllerLogger(logging.Logger):
         super(ControllerLogger, self)._log(level, msg, args, exc_info, extra)
 
 
-class Controller(object):
+class Controller(object): # pylint: disable=too-many-instance-attributes,too-many-public-methods
 
     _FILTER_SELENIUM_LOGS_ = False
     _FILTER_SELENIUM_LOG_STREAM_ = False
     _LOG_TO_FILE_ = False
+    _TRACE_ = False
+    _NETWORK_IDLE_MS_ = 500
+    _NETWORK_IDLE_TIMEOUT_ = 10
+    _READY_ = None
+    _READY_TIMEOUT_ = 30
+    _RETRY_ = None  # default RetryPolicy for element actions and waits
+    _CONNECTION_POOL_ = None  # options of a pooled keep-alive command executor, True for defaults
+    _CONCURRENCY_ = 1  # maximum concurrent per element commands, requires a connection pool
+    _VISUAL_BASELINES_ = 'baselines/'
+    _VISUAL_DIFFS_ = 'visual/'
+    _VISUAL_TOLERANCE_ = 0.0  # ratio of pixels allowed to differ from a baseline
+    _VISUAL_THRESHOLD_ = 0  # per channel difference tolerated for a pixel
+    _SESSION_PATH_ = 'sessions/'
+    _SESSION_EXPIRY_ = 3600  # seconds a saved session may be restored for
+    _WAIT_STATS_ = None  # path of a stats file to record and adapt element waits with
+    _FAILURE_ARTIFACTS_ = None  # directory to write failure bundles of waits to
 
     def __init__(self, browser, base_url, components, **env):
         """
@@ -66,12 +99,22 @@ class Controller(object):
         :type base_url: string
         :param components: Component objects to instantiate.
         :type components: dict
-        :param env: Key value pairs to pass to instantiated components.
+        :param env: Key value pairs to pass to instantiated components, `restore_session` is
+            reserved for the name or path of a saved session to restore.
         :type env: **kwargs => dict
         """
         self.browser = self.__patch_webdriver(browser)
-        self.js = E2EJS(browser) # pylint: disable=invalid-name
+        if self._CONNECTION_POOL_:
+            pool_connections(browser, **(
+                self._CONNECTION_POOL_ if isinstance(self._CONNECTION_POOL_, dict) else {}))
+        self.js = PysccJS(browser) # pylint: disable=invalid-name
         self.base_url = base_url
+        self.frame_path = ()  # frame selectors from the top level document, None if unknown
+        self.frame_scope = ()  # frame of components without a declared frame
+        self.script_timeout = None  # last async script timeout sent to the webdriver
+        self.dom_snapshot = None  # active dom snapshot, reads are answered from it
+        self.thread_pool = None  # created on first concurrent dispatch
+        self.artifact_writer = ArtifactWriter()
 
         log_format = '%(asctime)s - %(name)s - %(funcName)s - %(levelname)s - %(message)s'
 
@@ -105,17 +148,26 @@ class Controller(object):
             sfh.setFormatter(logging.Formatter(log_format))
             SeleniumLogger.addHandler(sfh)
 
+        self.tracer = None
+        if self._TRACE_:
+            # default tracer of the creating thread, class level calls such as wait resolve it
+            self.tracer = Tracer().start()
+            self.tracer.instrument(self.browser)
+
         if not isinstance(components, (tuple, list, dict)):
             raise TypeError('Components must be either a tuple, list, or dictionary')
 
+        restore_session = env.pop('restore_session', None)
         self.env = Resource(**env) if env else Resource()
 
         self.components = Resource(**{
             name: component(controller=self) for name, component in iteritems(components)})
 
         self.services = Resource()
+        self.state = State(self)
 
-        self.browser.get(self.base_url)
+        self.__load(self.base_url)
+        self.session_restored = bool(restore_session) and self.restore_session(restore_session)
 
     def __enter__(self):
         return self
@@ -149,6 +201,25 @@ class Controller(object):
 
         return webdriver
 
+    def dispatch(self, function, items):
+        """
+        Apply a function issuing webdriver commands to each item, concurrently up to
+        `_CONCURRENCY_` when commands are sent through a connection pool.
+
+        :param function: Function to apply.
+        :type function: callable
+        :param items: Items to apply the function to.
+        :type items: iterable
+        :return: list, results in order of the given items
+        """
+        items = list(items)
+        if self._CONCURRENCY_ < 2 or len(items) < 2 or \
+                not isinstance(self.browser.command_executor, PooledRemoteConnection):
+            return [function(item) for item in items]
+        if self.thread_pool is None:
+            self.thread_pool = ThreadPool(self._CONCURRENCY_)
+        return self.thread_pool.map(function, items)
+
     def add_service(self, name, prototype):
         """
         Adds new service to controller.
@@ -178,31 +249,245 @@ class Controller(object):
         """
         return self.browser.title
 
+    @traced('controller')
     def refresh(self):
         """
         Refreshes primary window.
         """
-        self.browser.switch_to_default_content()  # necessary for safari
+        if self.frame_path != ():
+            self.browser.switch_to_default_content()  # necessary for safari
         self.browser.refresh()
+        self.frame_path = self.frame_scope = ()
+
+    @staticmethod
+    def __poll(condition, deadline, interval=0.05):
+        while True:
+            try:
+                if condition():
+                    return True
+            except WebDriverException:
+                pass
+            if time.time() >= deadline:
+                return False
+            time.sleep(interval)
+
+    def __load(self, url, ready=None, element=None, timeout=None, error=False): # pylint: disable=too-many-arguments
+        ready = self._READY_ if ready is None else ready
+        if not ready:
+            self.browser.get(url)
+            self.frame_path = self.frame_scope = ()
+            return True
+        if ready not in READY_STRATEGIES:
+            raise ValueError('Ready strategy must be one of "{}"'.format(
+                '", "'.join(READY_STRATEGIES)))
+        if ready == 'component' and element is None:
+            raise ValueError('An element is required for the "component" ready strategy')
+        timeout = self._READY_TIMEOUT_ if timeout is None else timeout
+        token = str(uuid.uuid4())
+        try:
+            location = self.browser.execute_script(NAVIGATION_MARK, token)
+        except WebDriverException:
+            location = None
+        # hash navigations do not replace the document, no need to wait for the mark to disappear
+        same_document = location is not None and urldefrag(url)[1] and \
+            urldefrag(url)[0] == urldefrag(location)[0]
+        deadline = time.time() + timeout
+        self.browser.get(url)
+        self.frame_path = self.frame_scope = ()
+        mark = '' if same_document else token
+        result = self.__poll(lambda: self.browser.execute_script(
+            NAVIGATION_STATE, mark) in ('interactive', 'complete'), deadline)
+        if result and ready == 'component':
+            result = self.__poll(element.check.visible, deadline)
+        elif result and ready == 'idle':
+            result = self.wait_network_idle(timeout=max(deadline - time.time(), 0))
+        if error and not result:
+            raise TimeoutException(error if isinstance(error, string_types) else \
+                'Location "{}" was not ready ({}) within {} seconds'.format(url, ready, timeout))
+        return result
 
-    def navigate(self, route):
+    @traced('controller')
+    @captures_failure
+    def navigate(self, route, ready=None, element=None, timeout=None, error=False): # pylint: disable=too-many-arguments
         """
         Navigate to a route using your defined base url.
 
+        :Info: Pair readiness strategies with an "eager" or "none" page load strategy.
         :param route: Route to navigate to using defined base url.
         :type route: string
+        :param ready: Readiness strategy; "dom", "component", or "idle". Defaults to `_READY_`.
+        :type ready: string
+        :param element: Element expected to become visible for the "component" strategy.
+        :type element: Element
+        :param timeout: Time in seconds to wait for readiness, defaults to `_READY_TIMEOUT_`.
+        :type timeout: int, float
+        :param error: Error upon failure.
+        :type error: bool, string
+        :return: bool
         """
-        self.browser.get('{location}/{route}'.format(
+        return self.__load('{location}/{route}'.format(
             location=self.base_url,
             route=route
-        ))
+        ), ready, element, timeout, error)
+
+    def __session_path(self, session):
+        if session.endswith('.json'):
+            return session
+        return os.path.join(self._SESSION_PATH_, '{}.json'.format(session))
+
+    @traced('controller')
+    def save_session(self, session):
+        """
+        Save cookies, web storage, and the current location to be restored by later controllers.
+
+        :param session: Name of the session, such as a user or role, or path to a json file.
+        :type session: string
+        :return: string
+        """
+        path = self.__session_path(session)
+        state = self.state.dump()
+        state['location'] = self.location
+        state['saved'] = time.time()
+        return State.write(state, path)
+
+    @traced('controller')
+    def restore_session(self, session):
+        """
+        Restore a saved session and navigate to its location. Sessions older than
+        `_SESSION_EXPIRY_` or holding expired cookies are not restored.
+
+        :param session: Name of the session, such as a user or role, or path to a json file.
+        :type session: string
+        :return: bool
+        """
+        path = self.__session_path(session)
+        if not os.path.exists(path):
+            return False
+        with io.open(path, 'r', encoding='utf-8') as source:
+            state = json.load(source)
+        now = time.time()
+        if now - state.get('saved', 0) > self._SESSION_EXPIRY_ or any(
+                cookie.get('expiry', now) < now for cookie in state.get('cookies') or ()):
+            self.logger.info('Saved session "%s" expired, not restoring', path)
+            return False
+        self.state.load(state, clear=True)
+        location = state.get('location') or ''
+        # reload so the application picks up restored state, only within the base url
+        self.__load(location if location.startswith(self.base_url) else self.base_url)
+        return True
+
+    def __find_frame(self, selector):
+        expected_exceptions = (NoSuchElementException, InvalidSelectorException)
+        try:
+            return self.browser.find_element_by_css_selector(selector)
+        except expected_exceptions:
+            try:
+                return self.browser.find_element_by_xpath(selector)
+            except expected_exceptions:
+                return None
+
+    @traced('controller')
+    def switch_to_frame(self, path):
+        """
+        Switch into a frame context by path, switch commands are only issued when the path differs.
+
+        :param path: Selectors of nested frames starting from the top level document.
+        :type path: (string, ...)
+        :return: Controller
+        """
+        path = tuple(path)
+        current = self.frame_path
+        if current == path:
+            return self
+        if current is None:
+            self.browser.switch_to.default_content()
+            current = ()
+        common = 0
+        while common < min(len(current), len(path)) and current[common] == path[common]:
+            common += 1
+        for _ in range(len(current) - common):
+            self.browser.switch_to.parent_frame()
+        current = self.frame_path = path[:common]
+        for selector in path[len(current):]:
+            frame = self.__find_frame(selector)
+            if frame is None:
+                raise NoSuchFrameException('Frame by selector "{}" not found in "{}"'.format(
+                    selector, ' > '.join(self.frame_path) or 'top level document'))
+            self.browser.switch_to.frame(frame)
+            self.frame_path += (selector,)
+        return self
 
+    @contextmanager
+    def frame(self, target=None):
+        """
+        Context manager for operating within a frame, restores the previous frame on exit.
+
+        :param target: Frame element, selector relative to the current frame, or absolute path.
+        :type target: Element, string, (string, ...), None
+        :return: Controller
+        """
+        previous, scope = self.frame_path, self.frame_scope
+        if target is None:
+            path = ()
+        elif isinstance(target, string_types):
+            path = (self.frame_path or ()) + (target,)
+        elif isinstance(target, (tuple, list)):
+            path = tuple(target)
+        else:
+            declared = getattr(target.component, '__frame__', None)
+            if declared is None:
+                base = self.frame_scope or ()
+            else:
+                base = (declared,) if isinstance(declared, string_types) else tuple(declared)
+            path = base + (target.selector,)
+        self.switch_to_frame(path)
+        self.frame_scope = path
+        try:
+            yield self
+        finally:
+            self.frame_scope = scope
+            if previous is not None:
+                self.switch_to_frame(previous)
+
+    @contextmanager
+    def snapshot(self):
+        """
+        Context manager answering element reads from a point in time copy of the current
+        document, no further browser round trips are made for reads until the context exits.
+
+        :Warning: Requires the lxml and cssselect packages. Writes raise RuntimeError.
+        :return: Snapshot
+        """
+        if self.dom_snapshot is not None:
+            yield self.dom_snapshot
+            return
+        snapshot = Snapshot(self.browser.execute_script(SNAPSHOT), self.frame_path)
+        js = self.js  # pylint: disable=invalid-name
+        self.js = SnapshotJS(js)
+        self.dom_snapshot = snapshot
+        try:
+            yield snapshot
+        finally:
+            self.js = js
+            self.dom_snapshot = None
+
+    @staticmethod
+    def __match_location(route, location, strict):
+        if hasattr(route, 'match'):
+            found = route.match(location) if strict else route.search(location)
+            return bool(found) and (not strict or found.end() == len(location))
+        if hasattr(route, '__iter__') and not isinstance(route, string_types):
+            return any(Controller.__match_location(loc, location, strict) for loc in route)
+        return route == location if strict else route in location
+
+    @traced('controller')
+    @captures_failure
     def is_location(self, route, timeout=0, strict=False, error=False):
         """
         Check current webdriver location.
 
-        :param route: Route or list of routes to check against.
-        :type route: string, iterable
+        :param route: Route, compiled regular expression, or list of routes to check against.
+        :type route: string, re.Pattern, iterable
         :param timeout: Time in seconds to wait for route.
         :type timeout: int
         :param strict: Adds leniency to route comparison.
@@ -210,24 +495,59 @@ class Controller(object):
         :param error: Error upon failure.
         :type error: bool, string
         """
-        def check_location():
-            if hasattr(route, '__iter__') and not isinstance(route, string_types):
-                return any(loc == self.location if strict \
-                    else loc in self.location for loc in route)
-            return route == self.location if strict else route in self.location
-
-        result = self.wait(timeout=timeout, condition=check_location) \
-            if timeout else check_location()
+        if timeout:
+            return self.wait_location(route, timeout, strict, error)
+        result = self.__match_location(route, self.location, strict)
         if error and not result:
-            if isinstance(error, string_types):
-                msg = Template(error).safe_substitute(expected=route, found=self.location)
-            else:
-                # pylint: disable=line-too-long
-                msg = 'Location "{}" was not matched, instead found: "{}"'.format(route, self.location)
-            raise RuntimeError(msg)
-
+            self.__location_error(route, error)
         return result
 
+    @traced('controller')
+    @captures_failure
+    def wait_location(self, route, timeout=10, strict=False, error=False):
+        """
+        Wait for the webdriver location to match, history changes of single page applications
+        are observed in the page as they happen. Cross document navigations are polled.
+
+        :param route: Route, compiled regular expression, or list of routes to check against.
+        :type route: string, re.Pattern, iterable
+        :param timeout: Time in seconds to wait for route.
+        :type timeout: int, float
+        :param strict: Adds leniency to route comparison.
+        :type strict: bool
+        :param error: Error upon failure.
+        :type error: bool, string
+        :return: bool
+        """
+        deadline = time.time() + timeout
+        self.set_script_timeout(timeout + 5)
+        location = self.location
+        while not self.__match_location(route, location, strict):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                if error:
+                    self.__location_error(route, error)
+                return False
+            try:
+                location = self.browser.execute_async_script(
+                    LOCATION_CHANGE, location, int(remaining * 1000))
+            except WebDriverException:
+                # document unloaded while waiting, poll until the next document responds
+                time.sleep(0.05)
+                location = self.location
+        return True
+
+    def __location_error(self, route, error):
+        location = self.location
+        if isinstance(error, string_types):
+            msg = Template(error).safe_substitute(expected=route, found=location)
+        else:
+            msg = 'Location "{}" was not matched, instead found: "{}"'.format(
+                getattr(route, 'pattern', route), location)
+        raise RuntimeError(msg)
+
+    @traced('controller')
+    @captures_failure
     def window_by_title(self, title, timeout=0, strict=False, error=False):
         """
         Changes to window context by window title.
@@ -252,6 +572,7 @@ class Controller(object):
             return False
 
         result = self.wait(timeout=timeout, condition=search) if timeout else search()
+        self.frame_path = self.frame_scope = ()
         if error and not result:
             if isinstance(error, string_types):
                 msg = Template(error).safe_substitute(expected=title, found=self.title)
@@ -261,6 +582,8 @@ class Controller(object):
 
         return result
 
+    @traced('controller')
+    @captures_failure
     def window_by_location(self, location, timeout=0, strict=False, error=False):
         """
         Changes to window context by window path.
@@ -285,6 +608,7 @@ class Controller(object):
             return False
 
         result = self.wait(timeout=timeout, condition=search) if timeout else search()
+        self.frame_path = self.frame_scope = ()
         if error and not result:
             if isinstance(error, string_types):
                 msg = Template(error).safe_substitute(expected=location, found=self.location)
@@ -295,24 +619,184 @@ class Controller(object):
 
         return result
 
+    def set_script_timeout(self, timeout):
+        """
+        Raise the webdriver's async script timeout, commands are only issued when it must grow.
+
+        :param timeout: Time in seconds async scripts are required to run for.
+        :type timeout: int, float
+        """
+        if self.script_timeout is None or self.script_timeout < timeout:
+            self.browser.set_script_timeout(timeout)
+            self.script_timeout = timeout
+
+    def track_network(self):
+        """
+        Install in-page tracker for pending fetch/xhr requests and timers, once per document.
+
+        :return: bool
+        """
+        return self.browser.execute_script('return ' + NETWORK_TRACKER)
+
+    @traced('controller')
+    @captures_failure
+    def wait_network_idle(self, idle_ms=None, timeout=None, timers=True, error=False):
+        """
+        Wait for the page to have no pending fetch/xhr requests for the given quiet period.
+
+        :Warning: Requests dispatched before the tracker was installed can not be observed.
+        :param idle_ms: Time in milliseconds no requests may be pending for.
+        :type idle_ms: int
+        :param timeout: Time in seconds to wait for the network to be idle.
+        :type timeout: int, float
+        :param timers: Consider short lived timers as pending activity.
+        :type timers: bool
+        :param error: Error upon failure.
+        :type error: bool, string
+        :return: bool
+        """
+        idle_ms = self._NETWORK_IDLE_MS_ if idle_ms is None else idle_ms
+        timeout = self._NETWORK_IDLE_TIMEOUT_ if timeout is None else timeout
+        self.set_script_timeout(timeout + 5)
+        deadline = time.time() + timeout
+        result = False
+        while not result and time.time() < deadline:
+            try:
+                result = self.browser.execute_async_script(
+                    NETWORK_IDLE, idle_ms, int((deadline - time.time()) * 1000), timers)
+            except TimeoutException:
+                break
+            except WebDriverException:
+                # document unloaded while waiting, continue in the new document
+                time.sleep(0.05)
+        if error and not result:
+            raise TimeoutException(error if isinstance(error, string_types) else \
+                'Network was not idle for {}ms within {} seconds'.format(idle_ms, timeout))
+        return bool(result)
+
+    @traced('controller')
+    def verify_selectors(self, selectors, error=False, runs=1):
+        """
+        Count matches of selectors in one script per frame.
+
+        :param selectors: Selectors to verify as (name, selector, frame) entries.
+        :type selectors: [(string, string, (string, ...)), ...]
+        :param error: Error upon invalid or unmatched selectors.
+        :type error: bool, string
+        :param runs: Number of lookups per selector to average the lookup time over.
+        :type runs: int
+        :return: dict
+        """
+        frames = {}
+        for name, selector, frame in selectors:
+            frames.setdefault(frame, []).append((name, selector))
+        report = {'selectors': {}, 'invalid': [], 'missing': [], 'skipped': []}
+        previous = self.frame_path
+        try:
+            for frame, entries in iteritems(frames):
+                if frame is not None:
+                    self.switch_to_frame(frame)
+                elif previous is not None:
+                    self.switch_to_frame(previous)
+                results = self.browser.execute_script(
+                    VERIFY_SELECTORS, [selector for _, selector in entries], runs)
+                for (name, selector), (count, elapsed, engine) in zip(entries, results):
+                    report['selectors'][name] = {
+                        'selector': selector,
+                        'frame': frame,
+                        'count': count,
+                        'time': round(elapsed, 3),
+                        'engine': engine
+                    }
+                    if count is None:
+                        report['invalid'].append(name)
+                    elif not count:
+                        report['missing'].append(name)
+        finally:
+            if previous is not None:
+                self.switch_to_frame(previous)
+        report['invalid'].sort()
+        report['missing'].sort()
+        if error and (report['invalid'] or report['missing']):
+            raise NoSuchElementException(error if isinstance(error, string_types) else \
+                'Selectors failed verification; invalid: "{}", missing: "{}"'.format(
+                    '", "'.join(report['invalid']), '", "'.join(report['missing'])))
+        return report
+
+    def verify_components(self, samples=None, error=False):
+        """
+        Verify declared selectors of all components in one script per frame.
+
+        :param samples: Placeholder values to fill selector templates with.
+        :type samples: dict
+        :param error: Error upon invalid or unmatched selectors.
+        :type error: bool, string
+        :return: dict
+        """
+        selectors, skipped = self.__component_selectors(samples)
+        report = self.verify_selectors(selectors, error=error)
+        report['skipped'] = skipped
+        return report
+
+    def __component_selectors(self, samples):
+        selectors = []
+        skipped = []
+        for component_name, component in sorted(iteritems(vars(self.components))):
+            component_selectors, component_skipped = component.__selectors__(samples)
+            selectors.extend(('{}.{}'.format(component_name, name), selector, frame) \
+                for name, selector, frame in component_selectors)
+            skipped.extend('{}.{}'.format(component_name, name) for name in component_skipped)
+        return selectors, sorted(skipped)
+
+    def profile_selectors(self, selectors=None, samples=None, runs=20, top=None):
+        """
+        Rank selectors by the cost of looking them up in the current page, timed in the page
+        over a number of runs. Defaults to the declared selectors of all components.
+
+        :example: [{ 'name': 'home.tasks', 'time': 0.412, 'count': 3, 'engine': 'css', ... }]
+        :param selectors: Selectors to profile as (name, selector, frame) entries.
+        :type selectors: [(string, string, (string, ...)), ...]
+        :param samples: Placeholder values to fill selector templates of components with.
+        :type samples: dict
+        :param runs: Number of lookups per selector to average the lookup time over.
+        :type runs: int
+        :param top: Number of most expensive selectors to report, all by default.
+        :type top: int
+        :return: [dict, ...], most expensive first
+        """
+        if selectors is None:
+            selectors = self.__component_selectors(samples)[0]
+        report = self.verify_selectors(selectors, runs=runs)['selectors']
+        ranked = sorted((dict(entry, name=name) for name, entry in iteritems(report)),
+                        key=lambda entry: entry['time'], reverse=True)
+        return ranked[:top] if top else ranked
+
     @classmethod
-    def wait(cls, timeout=1, condition=None, reverse=False, throw_error=False):
+    @traced('controller')
+    def wait(cls, timeout=1, condition=None, reverse=False, throw_error=False, key=None): # pylint: disable=too-many-arguments
         """
         Assisted delays between browser and main thread.
 
         :param timeout: Time in seconds to wait.
-        :type timeout: int
-        :param condition: (callable) Wait 1 to timeout seconds until condition met.
+        :type timeout: int, float
+        :param condition: (callable) Wait until condition met, checked every second and once
+            more when the timeout is reached.
         :param reverse: Will wait for the condition to evaluate to False instead of True.
         :param throw_error: Will throw error raised by condition at end of timeout.
         :type throw_error: bool
+        :param key: Identifier of the wait, records durations and adapts polling when
+            `_WAIT_STATS_` is set.
+        :type key: string
         :return: bool
         """
         if callable(condition):
-            if not isinstance(timeout, int) or timeout < 1:
-                raise ValueError('Timeout must be an integer or float greater than or equal to 1')
+            if not isinstance(timeout, (int, float)) or timeout < 0:
+                raise ValueError('Timeout must be an integer or float greater than or equal to 0')
+            if key and cls._WAIT_STATS_:
+                return cls.__adaptive_wait(timeout, condition, reverse, throw_error, key)
+            deadline = time.time() + timeout
             error = None
-            for _ in range(timeout):
+            while True:
                 try:
                     if reverse:
                         if not condition():
@@ -323,7 +807,10 @@ class Controller(object):
                 except Exception as exc: # pylint: disable=broad-except
                     if throw_error:
                         error = exc
-                time.sleep(1)
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                time.sleep(min(remaining, 1))
             if error and throw_error:
                 raise error # pylint: disable=raising-bad-type
             return reverse
@@ -331,6 +818,30 @@ class Controller(object):
             time.sleep(timeout)
             return True
 
+    @classmethod
+    def __adaptive_wait(cls, timeout, condition, reverse, throw_error, key): # pylint: disable=too-many-arguments
+        stats = WaitStats.shared(cls._WAIT_STATS_)
+        started = time.time()
+        deadline = started + timeout
+        error = None
+        for interval in stats.intervals(key):
+            try:
+                if bool(condition()) != reverse:
+                    stats.record(key, time.time() - started, timeout)
+                    return not reverse
+            except Exception as exc: # pylint: disable=broad-except
+                if throw_error:
+                    error = exc
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+        stats.record(key, None, timeout)
+        if error and throw_error:
+            raise error # pylint: disable=raising-bad-type
+        return reverse
+
+    @traced('controller')
     def browser_logs(self, name=None, path=None):
         """
         Dumps browser logs to local directory.
@@ -354,6 +865,7 @@ class Controller(object):
         except WebDriverException:
             self.logger.critical('Browser logger object not found, could not return any logs.')
 
+    @traced('controller')
     def screen_shot(self, prefix=None, path=None):
         """
         Takes a screen shot and saves it specified path.
@@ -369,6 +881,91 @@ class Controller(object):
         self.browser.get_screenshot_as_file(filename=file_location)
         return file_location
 
+    @traced('controller')
+    def assert_visual(self, name, element=None, tolerance=None, threshold=None, ignore=None):  # pylint: disable=too-many-arguments
+        """
+        Compare a screen shot of the page or an element against a stored baseline.
+        Missing baselines are recorded from the screen shot, on failure the screen shot and
+        an image highlighting differing pixels are written to `_VISUAL_DIFFS_`.
+
+        :Warning: Requires the numpy and Pillow packages.
+        :param name: Name of the baseline.
+        :type name: string
+        :param element: Element to capture instead of the page.
+        :type element: Element, WebElement
+        :param tolerance: Ratio of pixels allowed to differ, defaults to `_VISUAL_TOLERANCE_`.
+        :type tolerance: float
+        :param threshold: Per channel difference tolerated, defaults to `_VISUAL_THRESHOLD_`.
+        :type threshold: int
+        :param ignore: Regions to ignore as (x, y, width, height) tuples or rect dictionaries,
+            in pixels of the screen shot.
+        :type ignore: [tuple or dict, ...]
+        :return: float, ratio of differing pixels
+        """
+        if element is not None and callable(getattr(element, 'get', None)):
+            found = element.get()
+            if not found:
+                raise NoSuchElementException(
+                    'Could not find element "{}" for visual check "{}"'.format(
+                        element.selector, name))
+            element = found
+        actual = visual.decode(element.screenshot_as_png if element is not None else
+                               self.browser.get_screenshot_as_png())
+        baseline_path = os.path.join(self._VISUAL_BASELINES_, '{}.png'.format(name))
+        baseline = visual.load_baseline(baseline_path)
+        if baseline is None:
+            self.logger.warning('Recording missing visual baseline "%s"', baseline_path)
+            visual.save_image(actual, baseline_path)
+            return 0.0
+        ratio, mask = visual.compare(
+            actual, baseline,
+            self._VISUAL_THRESHOLD_ if threshold is None else threshold, ignore)
+        if ratio > (self._VISUAL_TOLERANCE_ if tolerance is None else tolerance):
+            visual.save_image(actual, os.path.join(self._VISUAL_DIFFS_, '{}.png'.format(name)))
+            diff_path = visual.save_image(
+                visual.diff_image(actual, baseline, mask),
+                os.path.join(self._VISUAL_DIFFS_, '{}.diff.png'.format(name)))
+            raise AssertionError(
+                'Visual check "{}" differs from its baseline by {:.2%}{}, see "{}"'.format(
+                    name, ratio, '' if mask is not None else ' (size mismatch)', diff_path))
+        return ratio
+
+    def capture_failure(self, name, selector=None, error=None):
+        """
+        Capture the location, outer html of a component root or the document, console logs,
+        and a screen shot in a single bundle, written in the background to `_FAILURE_ARTIFACTS_`.
+
+        :Info: Console logs are only captured once `self.js.console_logger` was executed.
+        :param name: Name of the failure.
+        :type name: string
+        :param selector: Selector of the component root.
+        :type selector: string
+        :param error: Error of the failure.
+        :type error: Exception
+        :return: string, path the bundle will be written to
+        """
+        files = []
+        try:
+            artifacts = self.browser.execute_script(FAILURE_ARTIFACTS, selector)
+            files.append(('page.html', artifacts.pop('html')))
+            console = artifacts.pop('console')
+            if console:
+                files.append(('console.json', console))
+        except WebDriverException:
+            artifacts = {}
+        try:
+            files.append(('screenshot.png', self.browser.get_screenshot_as_png()))
+        except WebDriverException:
+            self.logger.warning('Could not capture screen shot of failure "%s"', name)
+        artifacts.update(name=name, selector=selector, time=time.time(),
+                         error=text_type(error) if error is not None else None)
+        files.append(('failure.json', json.dumps(artifacts, indent=2)))
+        path = self._FAILURE_ARTIFACTS_ if isinstance(
+            self._FAILURE_ARTIFACTS_, string_types) else 'artifacts/'
+        return self.artifact_writer.submit(
+            os.path.join(path, '{}.{}.{}.zip'.format(
+                name, int(time.time() * 1000), uuid.uuid4().hex[:8])), files)
+
     def exit(self, safe_exit=False):
         """
         Safely exit instance of webdriver.
@@ -384,3 +981,13 @@ class Controller(object):
             self.logger.warning('Could not close remote driver')
         finally:
             self.browser.quit()
+            if isinstance(self.browser.command_executor, PooledRemoteConnection):
+                self.browser.command_executor.close()
+            if self.thread_pool is not None:
+                self.thread_pool.terminate()
+            if self._WAIT_STATS_:
+                WaitStats.shared(self._WAIT_STATS_).save()
+            self.artifact_writer.flush()
+            if self.tracer:
+                self.tracer.stop().dump(
+                    self._TRACE_ if isinstance(self._TRACE_, string_types) else 'traces/')
@@ -15,21 +15,89 @@
 # specific language governing permissions and limitations
 # under the License.
 
+# pylint: disable=too-many-lines
+import hashlib
+import json
+import re
+import uuid
+from functools import wraps
 from string import Template
 from types import MethodType
 from selenium.common.exceptions import NoSuchElementException, ElementNotVisibleException, \
-    InvalidSelectorException, InvalidElementStateException
+    InvalidSelectorException, InvalidElementStateException, TimeoutException, WebDriverException
 from six import string_types, iteritems
 
+from pyscc.artifacts import captures_failure
 from pyscc.controller import Controller
-from pyscc.resource import Resource
+from pyscc.resource import BaseResource, Resource
+from pyscc.retry import retryable, retryable_wait
+from pyscc.scripts import FILL_FIELDS, FILTER_ELEMENTS, FILTER_MARK, HARVEST, HARVEST_CLEAR, \
+    WAIT_JS, WAIT_JS_CLEAR, WAIT_JS_START, WAIT_JS_STATUS
+from pyscc.selector import SelectorTemplate, compile_selector
+from pyscc.tracer import traced
 
 
 ELEMENTS_STALE_WAIT_TIME = 5
+JS_WAIT_TIME = 10  # default timeout in seconds of blocking javascript waits
+HARVEST_SETTLE_MS = 100  # time given to lists to render rows after scrolling
+INPUT_MODES = ('native', 'fast')
+
+
+def component_frame(component):
+    """
+    Fetch the frame path of a component, components without a declared frame live in the
+    controller's frame scope, the top level document unless within a frame context.
+
+    :param component: Component to inspect.
+    :type component: Component
+    :return: (string, ...), None if unknown
+    """
+    frame = getattr(component, '__frame__', None)
+    if frame is None:
+        return component.controller.frame_scope
+    if isinstance(frame, tuple):
+        return frame
+    return (frame,) if isinstance(frame, string_types) else tuple(frame)
+
+
+def wait_key(wrapper, wait):
+    """
+    Identify a wait of an element or elements by component, selector template, and wait type.
+
+    :param wrapper: Element or elements waited on.
+    :type wrapper: Element, Elements
+    :param wait: Name of the wait.
+    :type wait: string
+    :return: string
+    """
+    return '{}[{}].{}'.format(wrapper.component.__class__.__name__, wrapper.template.source, wait)
+
+
+def network_action(method):
+    """
+    Decorator for element actions, adds a `wait_idle` flag to wait for the network to be idle
+    once the action was performed. Actions raise RuntimeError while a dom snapshot is active.
+
+    :return: callable
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):  # pylint: disable=missing-docstring
+        if self.controller.dom_snapshot is not None:
+            raise RuntimeError('Element "{}" can not be modified while a snapshot is active'.format(
+                self.selector))
+        wait_idle = kwargs.pop('wait_idle', False)
+        if not wait_idle:
+            return method(self, *args, **kwargs)
+        self.controller.track_network()
+        result = method(self, *args, **kwargs)
+        if result is not None:
+            self.controller.wait_network_idle()
+        return result
+    return wrapper
 
 
 # pylint: disable=too-many-public-methods
-class Element(Resource):
+class Element(BaseResource):
     """
     Base resource for component element.
 
@@ -40,14 +108,19 @@ class Element(Resource):
     :param selector: Selector of given element.
     :type selector: string
     """
+    __slots__ = (
+        'controller', 'component', 'selector', 'template', 'values', 'wait_handle', '_check')
+
     def __init__(self, controller, component, selector):
         self.controller = controller
         self.component = component
         if hasattr(self.component, '_'):
             selector = self.component._ + ' ' + selector
-        self.selector = self._selector = selector
-        self.check = Check(self)
-        self.wait_handle = None  # used for js waits
+        self.selector = selector
+        self.template = compile_selector(selector)
+        self.values = None
+        self.wait_handle = None  # used for js waits, True once resolved
+        self._check = None
         self.validate()
 
     def __enter__(self):
@@ -56,7 +129,29 @@ class Element(Resource):
     def __exit__(self, _type, value, traceback):
         return True
 
+    @property
+    def _selector(self):
+        return self.template.source
+
+    @property
+    def check(self):
+        """
+        Element checks, created on first access.
+
+        :return: Check
+        """
+        if self._check is None:
+            self._check = Check(self)
+        return self._check
+
     def __find_element(self):
+        frame = component_frame(self.component)
+        snapshot = self.controller.dom_snapshot
+        if snapshot is not None and snapshot.covers(frame):
+            found = snapshot.find_all(self.selector)
+            return found[0] if found else None
+        if frame is not None:
+            self.controller.switch_to_frame(frame)
         expected_exceptions = (NoSuchElementException, InvalidSelectorException)
         try:
             return self.controller.browser.find_element_by_css_selector(self.selector)
@@ -68,13 +163,23 @@ class Element(Resource):
 
     def fmt(self, **kwargs):
         """
-        Used to format selectors.
+        Used to format selectors, the element itself is left untouched.
 
+        :raises KeyError: Selector has no placeholder for a given key.
         :return: Element
         """
-        self.selector = Template(self._selector).safe_substitute(**kwargs)
-        return self
-
+        values = self.template.bind(self.values, **kwargs)
+        clone = self.__class__.__new__(self.__class__)
+        clone.controller = self.controller
+        clone.component = self.component
+        clone.template = self.template
+        clone.values = values
+        clone.selector = self.template.render(values)
+        clone.wait_handle = None
+        clone._check = None  # pylint: disable=protected-access
+        return clone
+
+    @traced('element')
     def get(self):
         """
         Used to fetch a selenium WebElement.
@@ -83,6 +188,7 @@ class Element(Resource):
         """
         return self.__find_element()
 
+    @traced('element')
     def text(self, raw=False):
         """
         Get element text value.
@@ -96,6 +202,7 @@ class Element(Resource):
             return self.controller.js.get_raw_text(found) if raw else found.text
         return None
 
+    @traced('element')
     def value(self):
         """
         Get input element value.
@@ -104,6 +211,7 @@ class Element(Resource):
         """
         return self.controller.js.get_value(self.get())
 
+    @traced('element')
     def get_attribute(self, attribute):
         """
         Used to fetch specified element attribute.
@@ -115,6 +223,7 @@ class Element(Resource):
         """
         return self.controller.js.get_attribute(self.get(), attribute)
 
+    @traced('element')
     def set_attribute(self, attribute, value):
         """
         Used to set specified element attribute.
@@ -131,6 +240,7 @@ class Element(Resource):
             return self
         return None
 
+    @traced('element')
     def get_property(self, prop):
         """
         Used to fetch specified element property.
@@ -142,6 +252,7 @@ class Element(Resource):
         """
         return self.controller.js.get_property(self.get(), prop)
 
+    @traced('element')
     def set_property(self, prop, value):
         """
         Used to set specified element property.
@@ -158,6 +269,8 @@ class Element(Resource):
             return self
         return None
 
+    @traced('element')
+    @retryable
     def scroll_to(self):
         """
         Scroll to the given element.
@@ -170,6 +283,9 @@ class Element(Resource):
             return self
         return None
 
+    @traced('element')
+    @retryable
+    @network_action
     def trigger_event(self, event, event_type=None, options=None):
         """
         Dispatch event to given element.
@@ -180,6 +296,8 @@ class Element(Resource):
         :type event_type: string
         :param options: Options for event to dispatch.
         :type options: dict
+        :param wait_idle: Wait for the network to be idle after the action.
+        :type wait_idle: bool
         :return: Element, None
         """
         found = self.get()
@@ -188,10 +306,15 @@ class Element(Resource):
             return self
         return None
 
+    @traced('element')
+    @retryable
+    @network_action
     def click(self):
         """
         Execute a click on the given element.
 
+        :param wait_idle: Wait for the network to be idle after the action.
+        :type wait_idle: bool
         :return: Element, None
         """
         found = self.get()
@@ -201,10 +324,15 @@ class Element(Resource):
             return self
         return None
 
+    @traced('element')
+    @retryable
+    @network_action
     def dbl_click(self):
         """
         Execute a double click on the given element.
 
+        :param wait_idle: Wait for the network to be idle after the action.
+        :type wait_idle: bool
         :return: Element, None
         """
         found = self.get()
@@ -214,10 +342,15 @@ class Element(Resource):
             return self
         return None
 
+    @traced('element')
+    @retryable
+    @network_action
     def mouseup(self):
         """
         Dispatches a mouseup event on the given element.
 
+        :param wait_idle: Wait for the network to be idle after the action.
+        :type wait_idle: bool
         :return: Element, None
         """
         # pragma: no cover
@@ -229,10 +362,15 @@ class Element(Resource):
             return self
         return None
 
+    @traced('element')
+    @retryable
+    @network_action
     def mousedown(self):
         """
         Dispatches a mousedown event on the given element.
 
+        :param wait_idle: Wait for the network to be idle after the action.
+        :type wait_idle: bool
         :return: Element, None
         """
         # pragma: no cover
@@ -244,10 +382,15 @@ class Element(Resource):
             return self
         return None
 
+    @traced('element')
+    @retryable
+    @network_action
     def select(self):
         """
         Selects an option child element of a select element naturally.
 
+        :param wait_idle: Wait for the network to be idle after the action.
+        :type wait_idle: bool
         :return: Element, None
         """
         # pragma: no cover
@@ -260,7 +403,10 @@ class Element(Resource):
             return self
         return None
 
-    def send_input(self, value, force=False, clear=True):
+    @traced('element')
+    @retryable
+    @network_action
+    def send_input(self, value, force=False, clear=True, mode='native'):
         """
         Send input to element.
 
@@ -270,8 +416,22 @@ class Element(Resource):
         :type force: bool
         :param clear_field: Clear the element's input text prior to sending input.
         :type clear_field: bool
-        :return: Element, none
+        :param mode: Send keystrokes ("native") or set the value in a single script ("fast").
+        :type mode: string
+        :param wait_idle: Wait for the network to be idle after the action.
+        :type wait_idle: bool
+        :return: Element, None
         """
+        if mode not in INPUT_MODES:
+            raise ValueError('Input mode must be one of "{}"'.format('", "'.join(INPUT_MODES)))
+        if mode == 'fast' and not force:
+            frame = component_frame(self.component)
+            if frame is not None:
+                self.controller.switch_to_frame(frame)
+            if not self.controller.browser.execute_script(
+                    FILL_FIELDS, [[self.selector, value, clear]]):
+                return self
+            # fall back to keystrokes for fields without a native value setter
         found = self.get()
         if found:
             if force:
@@ -285,6 +445,9 @@ class Element(Resource):
             return self
         return None
 
+    @traced('element')
+    @captures_failure
+    @retryable_wait
     def wait_for(self, timeout, available=True, error=None):
         """
         Wait for a given element to become available.
@@ -298,7 +461,8 @@ class Element(Resource):
         :return: Element, None
         """
         if not self.controller.wait(timeout=timeout, condition=self.check.available \
-            if available else self.check.not_available):
+            if available else self.check.not_available,
+                                    key=wait_key(self, 'wait_for' if available else 'wait_gone')):
 
             if error:
                 raise NoSuchElementException(error if isinstance(error, string_types) else \
@@ -308,6 +472,9 @@ class Element(Resource):
 
         return self
 
+    @traced('element')
+    @captures_failure
+    @retryable_wait
     def wait_visible(self, timeout, error=None):
         """
         Wait for given element to be visible.
@@ -318,7 +485,8 @@ class Element(Resource):
         :type error: bool, string
         :return: Element, None
         """
-        if not self.controller.wait(timeout=timeout, condition=self.check.visible):
+        if not self.controller.wait(timeout=timeout, condition=self.check.visible,
+                                    key=wait_key(self, 'wait_visible')):
             if error:
                 raise ElementNotVisibleException(error if isinstance(error, string_types) else \
                     'Element by selector "{}" not found or is not visible'.format(self.selector))
@@ -326,6 +494,9 @@ class Element(Resource):
 
         return self
 
+    @traced('element')
+    @captures_failure
+    @retryable_wait
     def wait_invisible(self, timeout, error=None):
         """
         Wait for given element to be invisible.
@@ -336,7 +507,8 @@ class Element(Resource):
         :type error: bool, string
         :return: Element, None
         """
-        if not self.controller.wait(timeout=timeout, condition=self.check.invisible):
+        if not self.controller.wait(timeout=timeout, condition=self.check.invisible,
+                                    key=wait_key(self, 'wait_invisible')):
             if error:
                 raise InvalidElementStateException(error if isinstance(error, string_types) else \
                     'Element by selector "{}" not found or is visible'.format(self.selector))
@@ -344,6 +516,9 @@ class Element(Resource):
 
         return self
 
+    @traced('element')
+    @captures_failure
+    @retryable_wait
     def wait_enabled(self, timeout, error=None):
         """
         Wait for given element to be enabled.
@@ -354,7 +529,8 @@ class Element(Resource):
         :type error: bool, string
         :return: Element, None
         """
-        if not self.controller.wait(timeout=timeout, condition=self.check.enabled):
+        if not self.controller.wait(timeout=timeout, condition=self.check.enabled,
+                                    key=wait_key(self, 'wait_enabled')):
             if error:
                 raise InvalidElementStateException(error if isinstance(error, string_types) else \
                     'Element by selector "{}" not found or is disabled'.format(self.selector))
@@ -362,6 +538,9 @@ class Element(Resource):
 
         return self
 
+    @traced('element')
+    @captures_failure
+    @retryable_wait
     def wait_disabled(self, timeout, error=None):
         """
         Wait for given element to be disabled.
@@ -372,7 +551,8 @@ class Element(Resource):
         :type error: bool, string
         :return: Element, None
         """
-        if not self.controller.wait(timeout=timeout, condition=self.check.disabled):
+        if not self.controller.wait(timeout=timeout, condition=self.check.disabled,
+                                    key=wait_key(self, 'wait_disabled')):
             if error:
                 raise InvalidElementStateException(error if isinstance(error, string_types) else \
                     'Element by selector "{}" not found or is enabled'.format(self.selector))
@@ -380,28 +560,59 @@ class Element(Resource):
 
         return self
 
-    def wait_js(self, condition, interval):
+    @traced('element')
+    @captures_failure
+    def wait_js(self, condition, interval=50, timeout=None, block=False):
         """
-        Wait for element by javascript condition.
+        Wait for element by javascript condition, `$el` refers to the element.
+        Non blocking waits are checked with `check.wait_status`, a pending wait of the element is
+        cleared when a new one is started and resolved waits are removed from the page once
+        checked. Blocking waits resolve in a single async script.
 
         :param condition: Javascript condition to execute.
         :type condition: string
         :param interval: Interval to check condition by in ms.
         :type interval: int
-        :return: Element, None
-        """
-        self.wait_handle = self.controller.js.wait(condition, interval, self.selector)
-        return self
-
+        :param timeout: Time in seconds to wait for a blocking wait.
+        :type timeout: int, float
+        :param block: Wait for the condition, returning its value.
+        :type block: bool
+        :raises TimeoutException: Blocking wait condition not met in time.
+        :return: Element, value of the condition if blocking
+        """
+        if not block:
+            if isinstance(self.wait_handle, string_types):
+                self.controller.browser.execute_script(WAIT_JS_CLEAR, self.wait_handle)
+            self.wait_handle = str(uuid.uuid4())
+            self.controller.browser.execute_script(
+                WAIT_JS_START % condition, self.selector, self.wait_handle, interval)
+            return self
+        timeout = JS_WAIT_TIME if timeout is None else timeout
+        frame = component_frame(self.component)
+        if frame is not None:
+            self.controller.switch_to_frame(frame)
+        self.controller.set_script_timeout(timeout + 5)
+        result = self.controller.browser.execute_async_script(
+            WAIT_JS % condition, self.selector, interval, int(timeout * 1000))
+        if not result or not result.get('resolved'):
+            raise TimeoutException('Condition "{}" of element by selector "{}" not met within {} '
+                                   'seconds'.format(condition, self.selector, timeout))
+        return result['value']
+
+    @traced('element')
     def switch_to(self):
         """
-        Switch into an iframe element context.
+        Switch into an iframe element context, the controller's frame path and scope are updated
+        accordingly.
 
         :return: Element, None
         """
         found = self.get()
         if found:
+            path = self.controller.frame_path
             self.controller.browser.switch_to.frame(found)
+            self.controller.frame_path = self.controller.frame_scope = \
+                None if path is None else path + (self.selector,)
             return self
         return None
 
@@ -413,7 +624,7 @@ class Element(Resource):
     }
 
 
-class Elements(Resource):
+class Elements(BaseResource):
     """
     Base resource for component elements.
 
@@ -424,13 +635,17 @@ class Elements(Resource):
     :param selector: Selector of given elements.
     :type selector: string
     """
+    __slots__ = ('controller', 'component', 'selector', 'template', 'values', '_checks')
+
     def __init__(self, controller, component, selector):
         self.controller = controller
         self.component = component
         if hasattr(self.component, '_'):
             selector = self.component._ + ' ' + selector
-        self.selector = self._selector = selector
-        self.checks = Checks(self)
+        self.selector = selector
+        self.template = compile_selector(selector)
+        self.values = None
+        self._checks = None
         self.validate()
 
     def __enter__(self):
@@ -439,7 +654,28 @@ class Elements(Resource):
     def __exit__(self, _type, value, traceback):
         return True
 
+    @property
+    def _selector(self):
+        return self.template.source
+
+    @property
+    def checks(self):
+        """
+        Elements checks, created on first access.
+
+        :return: Checks
+        """
+        if self._checks is None:
+            self._checks = Checks(self)
+        return self._checks
+
     def __find_elements(self):
+        frame = component_frame(self.component)
+        snapshot = self.controller.dom_snapshot
+        if snapshot is not None and snapshot.covers(frame):
+            return snapshot.find_all(self.selector)
+        if frame is not None:
+            self.controller.switch_to_frame(frame)
         return self.controller.browser.find_elements_by_css_selector(self.selector) \
             or self.controller.browser.find_elements_by_xpath(self.selector)
 
@@ -449,13 +685,22 @@ class Elements(Resource):
 
     def fmt(self, **kwargs):
         """
-        Used to format selectors.
+        Used to format selectors, the elements instance itself is left untouched.
 
+        :raises KeyError: Selector has no placeholder for a given key.
         :return: Elements
         """
-        self.selector = Template(self._selector).safe_substitute(**kwargs)
-        return self
-
+        values = self.template.bind(self.values, **kwargs)
+        clone = self.__class__.__new__(self.__class__)
+        clone.controller = self.controller
+        clone.component = self.component
+        clone.template = self.template
+        clone.values = values
+        clone.selector = self.template.render(values)
+        clone._checks = None  # pylint: disable=protected-access
+        return clone
+
+    @traced('elements')
     def get(self):
         """
         Used to fetch a selenium WebElement.
@@ -464,6 +709,7 @@ class Elements(Resource):
         """
         return self.__find_elements()
 
+    @traced('elements')
     def count(self):
         """
         Used to count number of found elements.
@@ -472,6 +718,7 @@ class Elements(Resource):
         """
         return len(self.get())
 
+    @traced('elements')
     def text(self, raw=False, check_stale_element=False):
         """
         Get list of element text values.
@@ -486,17 +733,162 @@ class Elements(Resource):
             # wait in the event element list is actively loading
             self.__wait_elements_not_stale(ELEMENTS_STALE_WAIT_TIME)
         found = self.get()
-        if found:
-            collection = []
-            if raw:
-                for element in found:
-                    collection.append(self.controller.js.get_raw_text(element))
-            else:
-                for element in found:
-                    collection.append(element.text)
-            return collection
-        return []
+        if raw:
+            return [self.controller.js.get_raw_text(element) for element in found]
+        return self.read(lambda element: element.text, found)
+
+    @traced('elements')
+    def read(self, reader, found=None):
+        """
+        Read from each element with a function issuing webdriver commands, such as native text,
+        rects, or screen shots. Reads are dispatched concurrently up to the controller's
+        `_CONCURRENCY_` when commands are sent through a connection pool.
+
+        :param reader: Function taking a WebElement.
+        :type reader: callable
+        :param found: Elements to read from, fetched if not given.
+        :type found: [WebElement, ...]
+        :return: list
+        """
+        return self.controller.dispatch(reader, self.get() if found is None else found)
+
+    @traced('elements')
+    def rect(self):
+        """
+        Get list of element positions and sizes.
+
+        :return: [dict, ...]
+        """
+        return self.read(lambda element: element.rect)
+
+    def __mark(self, limit, spec):
+        if self.controller.dom_snapshot is not None:
+            raise RuntimeError('Elements can not be filtered while a snapshot is active')
+        if spec['textRe'] is not None:
+            pattern = spec['textRe']
+            pattern = pattern if hasattr(pattern, 'pattern') else re.compile(pattern)
+            spec['textRe'] = [pattern.pattern, ''.join(
+                flag for flag, value in (('i', re.I), ('m', re.M), ('s', re.S))
+                if pattern.flags & value)]
+        # marks are derived from the elements filtered, a filter replaces the marks of the
+        # previous filter of the same elements so marks and mark selectors stay bounded
+        mark = hashlib.md5(json.dumps([self.selector, limit]).encode('utf-8')).hexdigest()[:12]
+        frame = component_frame(self.component)
+        if frame is not None:
+            self.controller.switch_to_frame(frame)
+        count = self.controller.browser.execute_script(
+            FILTER_ELEMENTS, self.selector, mark, spec, limit)
+        return '[{}~="{}"]'.format(FILTER_MARK, mark), count
+
+    @traced('elements')
+    def filter(self, text=None, text_re=None, attr=None, visible=None, child=None): # pylint: disable=too-many-arguments
+        """
+        Narrow elements by predicates evaluated in the page, in a single command.
+        Matching elements are marked with an attribute the narrowed elements are bound to, marks
+        of the previous filter of the same elements are replaced.
+
+        :param text: Text expected, whitespace is collapsed.
+        :type text: string
+        :param text_re: Pattern expected to be found in the text.
+        :type text_re: string, re.Pattern
+        :param attr: Attribute values expected, True or False for attributes to be present or not.
+        :type attr: dict
+        :param visible: Visibility expected.
+        :type visible: bool
+        :param child: Css selector of a descendant to match text against instead.
+        :type child: string
+        :return: Elements
+        """
+        selector = self.__mark(0, {'text': text, 'textRe': text_re, 'attr': attr,
+                                   'visible': visible, 'child': child})[0]
+        clone = self.__class__.__new__(self.__class__)
+        clone.controller = self.controller
+        clone.component = self.component
+        clone.template = SelectorTemplate(selector)  # not cached, mark selectors are transient
+        clone.values = None
+        clone.selector = selector
+        clone._checks = None  # pylint: disable=protected-access
+        return clone
+
+    @traced('elements')
+    def first(self, text=None, text_re=None, attr=None, visible=None, child=None): # pylint: disable=too-many-arguments
+        """
+        Find the first element matching predicates evaluated in the page, in a single command.
+        Predicates are the same as those of `filter`, the mark of the previous match of the same
+        elements is replaced.
 
+        :return: Element, None
+        """
+        selector, count = self.__mark(1, {'text': text, 'textRe': text_re, 'attr': attr,
+                                          'visible': visible, 'child': child})
+        if not count:
+            return None
+        element = Element.__new__(Element)
+        element.controller = self.controller
+        element.component = self.component
+        element.template = SelectorTemplate(selector)
+        element.values = None
+        element.selector = selector
+        element.wait_handle = None
+        element._check = None  # pylint: disable=protected-access
+        return element
+
+    def harvest(self, key=None, fields=None, max_items=None, container=None, batch_size=100): # pylint: disable=too-many-arguments
+        """
+        Collect rows of a virtualized or infinite scrolling list, scrolling its container in the
+        page and streaming newly rendered rows back in batches. Rows are deduplicated by key in
+        the page, rows without a key are skipped.
+
+        Fields are read with specs: None for the row's text, "@attribute" for an attribute of
+        the row, and "selector" or "selector@attribute" for the text or an attribute of a
+        descendant.
+
+        :param key: Spec of the value identifying a row, defaults to the row's text.
+        :type key: string
+        :param fields: Names and specs of fields to read, defaults to {"text": None}.
+        :type fields: dict
+        :param max_items: Maximum number of rows to collect.
+        :type max_items: int
+        :param container: Css selector of the scrolling container, defaults to the nearest
+            scrollable ancestor of the rows.
+        :type container: string
+        :param batch_size: Number of rows collected per batch.
+        :type batch_size: int
+        :return: generator, [dict, ...] per batch
+        """
+        if self.controller.dom_snapshot is not None:
+            raise RuntimeError('Elements can not be harvested while a snapshot is active')
+        harvest = str(uuid.uuid4())
+        collected = 0
+        spec = {'key': key, 'fields': fields or {'text': None}, 'container': container,
+                'settle': HARVEST_SETTLE_MS, 'budget': JS_WAIT_TIME * 1000}
+        try:
+            while max_items is None or collected < max_items:
+                spec['batch'] = batch_size if max_items is None else \
+                    min(batch_size, max_items - collected)
+                result = self.__harvest_batch(harvest, spec)
+                if result['records']:
+                    collected += len(result['records'])
+                    yield result['records']
+                if result['done']:
+                    break
+        finally:
+            try:
+                self.controller.browser.execute_script(HARVEST_CLEAR, harvest)
+            except WebDriverException:
+                pass
+
+    # spans are recorded per batch, tracing the generator would only time its creation
+    @traced('elements')
+    def __harvest_batch(self, harvest, spec):
+        frame = component_frame(self.component)
+        if frame is not None:
+            self.controller.switch_to_frame(frame)
+        self.controller.set_script_timeout(JS_WAIT_TIME + 5)
+        return self.controller.browser.execute_async_script(
+            HARVEST, self.selector, harvest, spec)
+
+    @traced('elements')
     def value(self, check_stale_element=False):
         """
         Get list of input element values.
@@ -510,6 +902,7 @@ class Elements(Resource):
             self.__wait_elements_not_stale(ELEMENTS_STALE_WAIT_TIME)
         return [self.controller.js.get_value(element) for element in self.get()]
 
+    @traced('elements')
     def get_attribute(self, attribute, check_stale_element=False):
         """
         Used to fetch list of elements attributes.
@@ -525,6 +918,7 @@ class Elements(Resource):
             self.__wait_elements_not_stale(ELEMENTS_STALE_WAIT_TIME)
         return [self.controller.js.get_attribute(element, attribute) for element in self.get()]
 
+    @traced('elements')
     def set_attribute(self, attribute, value):
         """
         Used to set specified element attribute.
@@ -539,6 +933,7 @@ class Elements(Resource):
             self.controller.js.set_attribute(element, attribute, value)
         return self
 
+    @traced('elements')
     def get_property(self, prop, check_stale_element=False):
         """
         Used to fetch list of elements properties.
@@ -554,6 +949,7 @@ class Elements(Resource):
             self.__wait_elements_not_stale(ELEMENTS_STALE_WAIT_TIME)
         return [self.controller.js.get_property(element, prop) for element in self.get()]
 
+    @traced('elements')
     def set_property(self, prop, value):
         """
         Used to set specified element property.
@@ -568,6 +964,9 @@ class Elements(Resource):
             self.controller.js.set_property(element, prop, value)
         return self
 
+    @traced('elements')
+    @captures_failure
+    @retryable_wait
     def wait_for(self, timeout, length=1, strict=False, error=None):
         """
         Wait for given length of elements to be available.
@@ -583,7 +982,7 @@ class Elements(Resource):
         :return: Elements
         """
         if not self.controller.wait(timeout=timeout, condition=lambda: self.count() == length if \
-            strict else self.count() >= length):
+            strict else self.count() >= length, key=wait_key(self, 'wait_for')):
             if error:
                 if isinstance(error, string_types):
                     msg = Template(error).safe_substitute(expected=length, found=self.count())
@@ -596,6 +995,9 @@ class Elements(Resource):
 
         return self
 
+    @traced('elements')
+    @captures_failure
+    @retryable_wait
     def wait_visible(self, timeout, length=1, strict=False, error=None):
         """
         Wait for given length of elements to be available and visible.
@@ -614,13 +1016,17 @@ class Elements(Resource):
             # pylint: disable=line-too-long
             return self.count() == length if strict else self.count() >= length and self.checks.visible()
 
-        if not self.controller.wait(timeout=timeout, condition=check):
+        if not self.controller.wait(timeout=timeout, condition=check,
+                                    key=wait_key(self, 'wait_visible')):
             if error:
                 raise ElementNotVisibleException(error if isinstance(error, string_types) else \
                     '{} elements by selector "{}" not visible'.format(length, self.selector))
 
         return self
 
+    @traced('elements')
+    @captures_failure
+    @retryable_wait
     def wait_invisible(self, timeout, length=1, strict=False, error=None):
         """
         Wait for given length of elements to be available and invisible.
@@ -639,13 +1045,17 @@ class Elements(Resource):
             # pylint: disable=line-too-long
             return self.count() == length if strict else self.count() >= length and self.checks.invisible()
 
-        if not self.controller.wait(timeout=timeout, condition=check):
+        if not self.controller.wait(timeout=timeout, condition=check,
+                                    key=wait_key(self, 'wait_invisible')):
             if error:
                 raise InvalidElementStateException(error if isinstance(error, string_types) else \
                     '{} elements by selector "{}" not invisible'.format(length, self.selector))
 
         return self
 
+    @traced('elements')
+    @captures_failure
+    @retryable_wait
     def wait_enabled(self, timeout, length=1, strict=False, error=None):
         """
         Wait for given length of elements to be available and enabled.
@@ -664,13 +1074,17 @@ class Elements(Resource):
             # pylint: disable=line-too-long
             return self.count() == length if strict else self.count() >= length and self.checks.enabled()
 
-        if not self.controller.wait(timeout=timeout, condition=check):
+        if not self.controller.wait(timeout=timeout, condition=check,
+                                    key=wait_key(self, 'wait_enabled')):
             if error:
                 raise InvalidElementStateException(error if isinstance(error, string_types) else \
                     '{} elements by selector "{}" not enabled'.format(length, self.selector))
 
         return self
 
+    @traced('elements')
+    @captures_failure
+    @retryable_wait
     def wait_disabled(self, timeout, length=1, strict=False, error=None):
         """
         Wait for given length of elements to be available and disabled.
@@ -689,7 +1103,8 @@ class Elements(Resource):
             # pylint: disable=line-too-long
             return self.count() == length if strict else self.count() >= length and self.checks.disabled()
 
-        if not self.controller.wait(timeout=timeout, condition=check):
+        if not self.controller.wait(timeout=timeout, condition=check,
+                                    key=wait_key(self, 'wait_disabled')):
             if error:
                 raise InvalidElementStateException(error if isinstance(error, string_types) else \
                     '{} elements by selector "{}" not disabled'.format(length, self.selector))
@@ -704,17 +1119,20 @@ class Elements(Resource):
     }
 
 
-class Check(Resource):
+class Check(BaseResource):
     """
     Base resource for individual element checks.
 
     :param element: Element instance to reference.
     :type element: Element
     """
+    __slots__ = ('element',)
+
     def __init__(self, element):
         self.element = element
         self.validate()
 
+    @traced('check')
     def available(self):
         """
         Check element available.
@@ -723,6 +1141,7 @@ class Check(Resource):
         """
         return bool(self.element.get())
 
+    @traced('check')
     def not_available(self):
         """
         Check element not available.
@@ -731,6 +1150,7 @@ class Check(Resource):
         """
         return not bool(self.element.get())
 
+    @traced('check')
     def visible(self):
         """
         Check element visibility.
@@ -741,6 +1161,7 @@ class Check(Resource):
         return found and \
             self.element.controller.js.is_visible(found)
 
+    @traced('check')
     def invisible(self):
         """
         Check element invisible.
@@ -751,6 +1172,7 @@ class Check(Resource):
         return found and \
             not self.element.controller.js.is_visible(found)
 
+    @traced('check')
     def enabled(self):
         """
         Check element DOM node enabled.
@@ -761,6 +1183,7 @@ class Check(Resource):
         return found and \
             not self.element.controller.js.get_property(found, 'disabled')
 
+    @traced('check')
     def disabled(self):
         """
         Check element DOM node disabled.
@@ -771,26 +1194,38 @@ class Check(Resource):
         return found and \
             self.element.controller.js.get_property(found, 'disabled')
 
+    @traced('check')
     def wait_status(self):
         """
-        Check javascript wait status.
+        Check javascript wait status, resolved waits are not checked again.
+
+        :return: bool
         """
-        return self.element.controller.js.wait_status(self.element.wait_handle)
+        handle = self.element.wait_handle
+        if handle is True:
+            return True
+        if self.element.controller.browser.execute_script(WAIT_JS_STATUS, handle):
+            self.element.wait_handle = True
+            return True
+        return False
 
     meta = {'required_fields': [('element', Element)]}
 
 
-class Checks(Resource):
+class Checks(BaseResource):
     """
     Base resource for multiple element checks.
 
     :param elements: Elements instance to reference.
     :type element: Elements
     """
+    __slots__ = ('elements',)
+
     def __init__(self, elements):
         self.elements = elements
         self.validate()
 
+    @traced('check')
     def visible(self):
         """
         Used to check at least one element is available and all are visible.
@@ -805,6 +1240,7 @@ class Checks(Resource):
                 return False
         return True
 
+    @traced('check')
     def invisible(self):
         """
         Used to check at least one element is available and all are invisible.
@@ -819,6 +1255,7 @@ class Checks(Resource):
                 return False
         return True
 
+    @traced('check')
     def enabled(self):
         """
         Used to check at least one element is available and all are enabled.
@@ -833,6 +1270,7 @@ class Checks(Resource):
                 return False
         return True
 
+    @traced('check')
     def disabled(self):
         """
         Used to check at least one element is available and all are disabled.
@@ -936,16 +1374,33 @@ class CheckGroup(Resource):
     meta = {'required_fields': [('group', Resource)]}
 
 
+class ComponentProperty(property):
+    """
+    Property produced by the component decorators, recorded in the registry of
+    the component class it is defined on.
+
+    :param getter: Property getter.
+    :type getter: callable
+    :param kind: Kind of definition; element, elements, or group.
+    :type kind: string
+    :param ref: Decorated definition.
+    :type ref: callable
+    """
+    def __init__(self, getter, kind, ref):
+        super(ComponentProperty, self).__init__(getter)
+        self.kind = kind
+        self.ref = ref
+
+
 def component_element(ref):
     """
     Wrapper for singular component element.
 
     :return: Element
     """
-    @property
     def wrapper(self):  # pylint: disable=missing-docstring
         return Element(self.controller, self, ref(self))
-    return wrapper
+    return ComponentProperty(wrapper, 'element', ref)
 
 
 def component_elements(ref):
@@ -954,10 +1409,9 @@ def component_elements(ref):
 
     :return: Elements
     """
-    @property
     def wrapper(self):  # pylint: disable=missing-docstring
         return Elements(self.controller, self, ref(self))
-    return wrapper
+    return ComponentProperty(wrapper, 'elements', ref)
 
 
 def component_group(ref):
@@ -967,25 +1421,58 @@ def component_group(ref):
     :return: Resource
     """
     def fmt(self, **kwargs): # pylint: disable=missing-docstring
-        # pylint: disable=C0103, W0212
+        unknown = [key for key in kwargs if not any(
+            key in getattr(self, element).template.placeholders for element in self.__group__)]
+        if unknown:
+            raise KeyError('Component group has no placeholder for "{}"'.format(
+                '", "'.join(sorted(unknown))))
+        elements = {}
         for element in self.__group__:
-            el = getattr(self, element)
-            el._selector = Template(el._selector).safe_substitute(**kwargs)
-            el.selector = el._selector
-        return self
-
-    @property
-    def wrapper(self): # pylint: disable=missing-docstring
-        group_def = ref(self)
-        # pylint: disable=line-too-long
-        group = Resource(**{element: Element(self.controller, self, (group_def.get('_') + ' ' + selector) if \
-            group_def.get('_') else selector) for element, selector in iteritems(group_def) \
-            if selector != '_'})
-        group.__group__ = [element for element, _ in iteritems(group_def) if element != '_']
+            el = getattr(self, element)  # pylint: disable=C0103
+            elements[element] = el.fmt(**{key: value for key, value in iteritems(kwargs) \
+                if key in el.template.placeholders})
+        return build(elements, self.__group__)
+
+    def fill(self, values, native=(), clear=True): # pylint: disable=missing-docstring
+        unknown = [name for name in values if name not in self.__group__]
+        if unknown:
+            raise KeyError('Component group has no element "{}"'.format('", "'.join(unknown)))
+        fields = [(name, value) for name, value in iteritems(values) if name not in native]
+        if fields:
+            first = getattr(self, fields[0][0])
+            if first.controller.dom_snapshot is not None:
+                raise RuntimeError('Component group can not be filled while a snapshot is active')
+            frame = component_frame(first.component)
+            if frame is not None:
+                first.controller.switch_to_frame(frame)
+            failed = first.controller.browser.execute_script(FILL_FIELDS, [
+                [getattr(self, name).selector, value, clear] for name, value in fields])
+        else:
+            failed = []
+        # fall back to keystrokes for native fields and fields without a native value setter
+        fallback = [fields[index] for index in failed] + \
+            [(name, value) for name, value in iteritems(values) if name in native]
+        found = True
+        for name, value in fallback:
+            found = getattr(self, name).send_input(value, clear=clear) is not None and found
+        return self if found else None
+
+    def build(elements, names):
+        group = Resource(**elements)
+        group.__group__ = names
         group.fmt = MethodType(fmt, group)
+        group.fill = MethodType(fill, group)
         group.check = CheckGroup(group)
         # pylint: disable=no-value-for-parameter
         group.find = lambda element: getattr(group, element, None)
         return group
 
-    return wrapper
+    def wrapper(self): # pylint: disable=missing-docstring
+        group_def = ref(self)
+        root = group_def.get('_')
+        # pylint: disable=line-too-long
+        return build({element: Element(self.controller, self, (root + ' ' + selector) if root else selector) \
+            for element, selector in iteritems(group_def) if element != '_'},
+                     [element for element, _ in iteritems(group_def) if element != '_'])
+
+    return ComponentProperty(wrapper, 'group', ref)
@@ -0,0 +1,96 @@
+# Licensed to the Software Freedom Conservancy (SFC) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The SFC licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from pyseleniumjs import E2EJS
+
+from pyscc.scripts import HELPER_CALL, HELPERS, HELPERS_MISSING
+
+
+class PysccJS(E2EJS):
+    """
+    E2EJS with hot operations routed through a helper namespace installed once per document,
+    each operation sends a small, constant script instead of its full source.
+
+    :param browser: Webdriver to execute scripts with.
+    :type browser: WebDriver
+    """
+    def __call(self, helper, *args):
+        result = self.browser.execute_script(HELPER_CALL, helper, *args)
+        if result == HELPERS_MISSING:
+            # new document or frame since the last call, install helpers and retry
+            self.browser.execute_script(HELPERS)
+            result = self.browser.execute_script(HELPER_CALL, helper, *args)
+        return result
+
+    def is_visible(self, element):
+        """
+        Get the visibility of the provided target element.
+
+        :param element: Element for browser instance to target.
+        :type element: WebElement
+        :return: bool
+        """
+        return bool(self.__call('visible', element))
+
+    def get_property(self, element, prop):
+        """
+        Return the given property of the target element.
+
+        :param element: Element for browser instance to target.
+        :type element: WebElement
+        :param prop: Property of target element to return.
+        :type prop: string
+        :return: None, bool, int, float, string
+        """
+        return self.__call('property', element, prop)
+
+    def click(self, element):
+        """
+        Execute the `click` event on the target element.
+
+        :param element: Element for browser instance to target.
+        :type element: WebElement
+        """
+        self.__call('click', element)
+
+    def scroll_into_view(self, element):
+        """
+        Scroll the target element into view.
+
+        :param element: Element for browser instance to target.
+        :type element: WebElement
+        """
+        self.__call('scroll', element)
+
+    def trigger_event(self, element, event, event_type=None, options=None):
+        """
+        Trigger specified events of the given elements in a single command.
+
+        :param element: Element for browser instance to target.
+        :type element: WebElement, (WebElement, ...)
+        :param event: Event to trigger from target element.
+        :type event: string, (string, ...)
+        :param event_type: Event type.
+        :type event_type: string
+        :param options: Event options.
+        :type options: dict
+        """
+        self.__call(
+            'trigger',
+            list(element) if isinstance(element, (tuple, list)) else [element],
+            list(event) if isinstance(event, (tuple, list)) else [event],
+            event_type, options)
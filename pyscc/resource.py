@@ -18,30 +18,54 @@
 from six import iteritems
 
 
-class Resource(object): # pylint: disable=too-few-public-methods
+_RULES = {}
+
+
+class BaseResource(object): # pylint: disable=too-few-public-methods
     """
-    Base object for shenanigans.
+    Base object for compact resources, subclasses are expected to define `__slots__`.
+    Validation may be disabled globally by toggling `BaseResource._VALIDATE_`.
     """
-    def __init__(self, **kwargs):
-        for prop, val in iteritems(kwargs):
-            setattr(self, prop, val)
-        self.validate()
+    __slots__ = ()
+
+    _VALIDATE_ = True
+
+    def __rules(self):
+        """
+        Compile validation rules from defined meta data, rules are cached per class.
+
+        :return: ((string, type), ...)
+        """
+        meta = getattr(self, 'meta', None)
+        shared = meta is getattr(self.__class__, 'meta', None)
+        rules = _RULES.get(self.__class__) if shared else None
+        if rules is None:
+            fields = (meta.get('required_fields') if meta else None) or ()
+            rules = tuple((field[0], field[1]) if isinstance(field, (list, tuple)) \
+                else (field, None) for field in fields)
+            if shared:
+                _RULES[self.__class__] = rules
+        return rules
 
     def validate(self):
         """
         Validate resource with defined meta data.
         """
-        meta = getattr(self, 'meta', None)
-        if meta and meta.get('required_fields'):
-            required_fields = meta.get('required_fields')
-            for field in required_fields:
-                if isinstance(field, (list, tuple)):
-                    field, types = field
-                    if not hasattr(self, field):
-                        raise AttributeError('Resource missing required field "{}"'.format(field))
-                    if not isinstance(getattr(self, field), types):
-                        raise ValueError(
-                            'Field "{}" is not of type "{}" as expected'.format(field, types))
-                else:
-                    if not hasattr(self, field):
-                        raise AttributeError('Resource missing required field "{}"'.format(field))
+        if not self._VALIDATE_:
+            return
+        for field, types in self.__rules():
+            if not hasattr(self, field):
+                raise AttributeError('Resource missing required field "{}"'.format(field))
+            if types and not isinstance(getattr(self, field), types):
+                raise ValueError(
+                    'Field "{}" is not of type "{}" as expected'.format(field, types))
+
+
+class Resource(BaseResource): # pylint: disable=too-few-public-methods
+    """
+    Base object for shenanigans.
+    """
+    def __init__(self, **kwargs):
+        for prop, val in iteritems(kwargs):
+            setattr(self, prop, val)
+        self.validate()
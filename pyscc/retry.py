@@ -0,0 +1,200 @@
+# Licensed to the Software Freedom Conservancy (SFC) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The SFC licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import time
+from functools import partial, wraps
+
+from selenium.common.exceptions import ElementClickInterceptedException, \
+    ElementNotInteractableException, ElementNotVisibleException, InvalidElementStateException, \
+    NoSuchElementException, StaleElementReferenceException
+
+
+RETRYABLE_EXCEPTIONS = (
+    ElementClickInterceptedException, ElementNotInteractableException, ElementNotVisibleException,
+    InvalidElementStateException, NoSuchElementException, StaleElementReferenceException)
+# raised by waits once their timeout is spent, waits are not retried on these
+WAIT_TIMEOUT_EXCEPTIONS = (
+    ElementNotVisibleException, InvalidElementStateException, NoSuchElementException)
+
+
+class RetryPolicy(object):
+    """
+    Bounded retries for flaky interactions, retries are recorded in `metrics` per operation.
+
+    :param attempts: Maximum number of attempts, including the first.
+    :type attempts: int
+    :param backoff: Time in seconds to sleep before the first retry, doubled after each retry.
+    :type backoff: int, float
+    :param exceptions: Exceptions considered transient.
+    :type exceptions: (Exception, ...)
+    :param budget: Time in seconds all attempts of an operation may take, no retries are
+        started once it is spent and waits are given the time left as their timeout.
+    :type budget: int, float, None
+    :param on_none: Retry actions returning None, such as actions on unavailable elements.
+    :type on_none: bool
+    """
+    _BACKOFF_FACTOR_ = 2
+
+    def __init__(self, attempts=3, backoff=0.1, exceptions=RETRYABLE_EXCEPTIONS, budget=None,
+                 on_none=False):
+        if attempts < 1:
+            raise ValueError('Retry policy requires at least one attempt')
+        self.attempts = attempts
+        self.backoff = backoff
+        self.exceptions = tuple(exceptions)
+        self.budget = budget
+        self.on_none = on_none
+        self.metrics = {}
+
+    def record(self, name, attempts, failed, elapsed):
+        """
+        Record an operation in the policy's metrics.
+
+        :param name: Name of the operation.
+        :type name: string
+        :param attempts: Number of attempts made.
+        :type attempts: int
+        :param failed: Operation failed after its last attempt.
+        :type failed: bool
+        :param elapsed: Time in seconds spent on retries, including backoff.
+        :type elapsed: float
+        """
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = {'calls': 0, 'retries': 0, 'failures': 0, 'time': 0.0}
+        metric['calls'] += 1
+        metric['retries'] += attempts - 1
+        metric['failures'] += int(failed)
+        metric['time'] += elapsed
+
+    def run(self, name, operation, *args, **kwargs):
+        """
+        Run an operation, retrying transient failures within the policy's attempts and budget.
+
+        :param name: Name of the operation, used for metrics.
+        :type name: string
+        :param operation: Callable to run.
+        :type operation: callable
+        :return: Result of the operation.
+        """
+        return self.__run(name, lambda: operation(*args, **kwargs), self.on_none, ())
+
+    def run_wait(self, name, wait, timeout, *args, **kwargs):
+        """
+        Run a wait, retrying transient failures with the time left of its timeout and the
+        policy's budget as the timeout of each attempt. Waits are not retried once timed out.
+
+        :param name: Name of the wait, used for metrics.
+        :type name: string
+        :param wait: Callable to run, taking a timeout as its first argument.
+        :type wait: callable
+        :param timeout: Time in seconds all attempts may take.
+        :type timeout: int, float
+        :return: Result of the wait.
+        """
+        deadline = time.time() + (timeout if self.budget is None else min(timeout, self.budget))
+        return self.__run(name, lambda: wait(max(deadline - time.time(), 0), *args, **kwargs),
+                          False, WAIT_TIMEOUT_EXCEPTIONS)
+
+    def __run(self, name, operation, on_none, final):
+        started = time.time()
+        retried = None  # time the first retry was started
+        delay = self.backoff
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = operation()
+            except self.exceptions as exc:
+                if isinstance(exc, final) or not self.__retry(attempt, started, delay):
+                    self.record(name, attempt, True, time.time() - (retried or time.time()))
+                    raise
+            else:
+                if result is not None or not on_none or \
+                        not self.__retry(attempt, started, delay):
+                    self.record(name, attempt, result is None and on_none,
+                                time.time() - retried if retried else 0.0)
+                    return result
+            retried = retried or time.time()
+            time.sleep(delay)
+            delay *= self._BACKOFF_FACTOR_
+
+    def __retry(self, attempt, started, delay):
+        if attempt >= self.attempts:
+            return False
+        return self.budget is None or time.time() - started + delay < self.budget
+
+
+def resolve_policy(element, policy):
+    """
+    Resolve the retry policy of an element operation, from the `retry` argument, then the
+    component's `__retry__`, then the controller's `_RETRY_`.
+
+    :param element: Element or elements the operation belongs to.
+    :type element: Element, Elements
+    :param policy: Policy passed as `retry` argument.
+    :type policy: RetryPolicy, bool, None
+    :return: RetryPolicy, None
+    """
+    if policy is None:
+        # pylint: disable=protected-access
+        policy = getattr(element.component, '__retry__', None) or element.controller._RETRY_
+    return policy or None
+
+
+def retryable(method):
+    """
+    Decorator for element actions, adds a `retry` argument taking a RetryPolicy, or False to
+    disable retries. Actions default to the policy of their component (`__retry__`), then
+    their controller (`_RETRY_`).
+
+    :return: callable
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):  # pylint: disable=missing-docstring
+        policy = resolve_policy(self, kwargs.pop('retry', None))
+        if policy is None:
+            return method(self, *args, **kwargs)
+        return policy.run(
+            '{}.{}'.format(self.__class__.__name__, name), method, self, *args, **kwargs)
+    return wrapper
+
+
+def retryable_wait(method):
+    """
+    Decorator for element waits taking a timeout as their first argument, adds a `retry`
+    argument like `retryable`. Retries share the wait's timeout, and waits are not retried
+    on their own timeout errors or None results.
+
+    :return: callable
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):  # pylint: disable=missing-docstring
+        policy = resolve_policy(self, kwargs.pop('retry', None))
+        if policy is None:
+            return method(self, *args, **kwargs)
+        if 'timeout' in kwargs:
+            timeout = kwargs.pop('timeout')
+        else:
+            timeout, args = args[0], args[1:]
+        return policy.run_wait('{}.{}'.format(self.__class__.__name__, name),
+                               partial(method, self), timeout, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,300 @@
+# Licensed to the Software Freedom Conservancy (SFC) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The SFC licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+"""
+Duration aware process sharding for pyscc suites, each shard runs in its own pytest process
+and working directory so controllers, logs, and screen shots are isolated per shard.
+
+Usage: python -m pyscc.runner [-n SHARDS] [--history PATH] [--output PATH] [pytest args ...]
+
+The module doubles as a pytest plugin recording per test durations for the shard it runs in.
+"""
+import argparse
+import heapq
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import time
+from xml.etree import ElementTree
+
+from six import iteritems, text_type
+
+
+HISTORY_PATH = '.pyscc_durations.json'
+OUTPUT_PATH = 'target/pyscc-runner/'
+DEFAULT_DURATION = 1.0  # seconds assumed for tests without history, when no history exists
+
+SHARD_FILES = ('output.log', 'durations.json', 'junit.xml')
+
+_DURATIONS = {}  # per test durations recorded by the plugin hooks
+
+
+def load_history(path=HISTORY_PATH):
+    """
+    Load persisted test durations.
+
+    :param path: Path of the duration history.
+    :type path: string
+    :return: dict
+    """
+    if not os.path.exists(path):
+        return {}
+    with io.open(path, 'r', encoding='utf-8') as history:
+        return json.load(history)
+
+
+def save_history(history, path=HISTORY_PATH):
+    """
+    Persist test durations.
+
+    :param history: Test node ids mapped to durations in seconds.
+    :type history: dict
+    :param path: Path of the duration history.
+    :type path: string
+    """
+    with io.open(path, 'w', encoding='utf-8') as history_file:
+        history_file.write(text_type(json.dumps(history, indent=2, sort_keys=True)))
+
+
+def schedule(tests, history, shards):
+    """
+    Distribute tests across shards longest first, each test is assigned to the shard with the
+    least scheduled time. Tests without history are assumed to take the median known duration.
+
+    :param tests: Test node ids to distribute.
+    :type tests: [string, ...]
+    :param history: Test node ids mapped to durations in seconds.
+    :type history: dict
+    :param shards: Number of shards.
+    :type shards: int
+    :return: [([string, ...], float), ...]
+    """
+    known = sorted(history[test] for test in tests if test in history)
+    default = known[len(known) // 2] if known else DEFAULT_DURATION
+    durations = [(history.get(test, default), test) for test in tests]
+    durations.sort(key=lambda entry: (-entry[0], entry[1]))
+    plan = [([], 0.0) for _ in range(max(1, shards))]
+    heap = [(0.0, index) for index in range(len(plan))]
+    for duration, test in durations:
+        total, index = heapq.heappop(heap)
+        plan[index][0].append(test)
+        plan[index] = (plan[index][0], total + duration)
+        heapq.heappush(heap, (total + duration, index))
+    return plan
+
+
+def collect(args):
+    """
+    Collect test node ids with pytest.
+
+    :param args: Pytest arguments selecting tests.
+    :type args: [string, ...]
+    :return: [string, ...]
+    """
+    output = subprocess.check_output(
+        [sys.executable, '-m', 'pytest', '--collect-only', '-q'] + list(args))
+    return [line.strip() for line in output.decode('utf-8').splitlines() if '::' in line]
+
+
+def split_args(args):
+    """
+    Separate test selections, paths of test directories and modules or node ids, from pytest
+    options and their values. Option values naming existing paths are made absolute since
+    shards run in their own working directory.
+
+    :param args: Pytest arguments.
+    :type args: [string, ...]
+    :return: ([string, ...], [string, ...]), selections and options
+    """
+    selections, options = [], []
+    for arg in args:
+        path = arg.split('::', 1)[0]
+        if arg.startswith('-') or not os.path.exists(path):
+            options.append(arg)
+        elif os.path.isdir(path) or path.endswith('.py'):
+            selections.append(arg)
+        else:
+            options.append(os.path.abspath(arg))
+    return selections, options
+
+
+def merge_results(paths, target):
+    """
+    Merge junit xml reports of shards into a single report.
+
+    :param paths: Paths of shard junit xml reports.
+    :type paths: [string, ...]
+    :param target: Path of the merged report.
+    :type target: string
+    :return: dict
+    """
+    merged = ElementTree.Element('testsuites')
+    totals = {'tests': 0, 'failures': 0, 'errors': 0, 'skipped': 0}
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        root = ElementTree.parse(path).getroot()
+        for suite in ([root] if root.tag == 'testsuite' else root.findall('testsuite')):
+            for key in totals:
+                totals[key] += int(suite.get(key, 0))
+            merged.append(suite)
+    for key, value in iteritems(totals):
+        merged.set(key, str(value))
+    ElementTree.ElementTree(merged).write(target, encoding='utf-8', xml_declaration=True)
+    return totals
+
+
+def merge_artifacts(shard_paths, output):
+    """
+    Copy logs, screen shots, and other files written by shards into the output directory,
+    file names are prefixed with their shard. Shard output is concatenated into one log.
+
+    :param shard_paths: Working directories of shards.
+    :type shard_paths: [string, ...]
+    :param output: Output directory.
+    :type output: string
+    """
+    with io.open(os.path.join(output, 'output.log'), 'w', encoding='utf-8') as log:
+        for shard_path in shard_paths:
+            shard = os.path.basename(shard_path)
+            shard_log = os.path.join(shard_path, 'output.log')
+            if os.path.exists(shard_log):
+                log.write(text_type('==== {} ====\n'.format(shard)))
+                with io.open(shard_log, 'r', encoding='utf-8', errors='replace') as shard_output:
+                    log.write(shard_output.read())
+            for directory, _, files in os.walk(shard_path):
+                relative = os.path.relpath(directory, shard_path)
+                for name in files:
+                    if relative == '.' and name in SHARD_FILES:
+                        continue
+                    target = os.path.join(output, relative)
+                    if not os.path.exists(target):
+                        os.makedirs(target)
+                    shutil.copy2(os.path.join(directory, name),
+                                 os.path.join(target, '{}_{}'.format(shard, name)))
+
+
+def spawn_shard(path, tests, root, options=()):
+    """
+    Start a pytest process for a shard in its own working directory.
+
+    :param path: Working directory of the shard.
+    :type path: string
+    :param tests: Test node ids to run.
+    :type tests: [string, ...]
+    :param root: Root directory of the suite.
+    :type root: string
+    :param options: Pytest options given to the runner.
+    :type options: [string, ...]
+    :return: subprocess.Popen
+    """
+    os.makedirs(path)
+    env = dict(os.environ, PYSCC_DURATIONS=os.path.join(path, 'durations.json'))
+    env['PYTHONPATH'] = os.pathsep.join(
+        entry for entry in (root, os.environ.get('PYTHONPATH')) if entry)
+    # the shard inherits its own handle of the log, ours is closed once it has started
+    with io.open(os.path.join(path, 'output.log'), 'w', encoding='utf-8') as log:
+        # shards run concurrently, the process is waited on by the caller
+        return subprocess.Popen(  # pylint: disable=consider-using-with
+            [sys.executable, '-m', 'pytest', '-p', 'pyscc.runner', '--rootdir', root,
+             '--junitxml', os.path.join(path, 'junit.xml')] + list(options) + \
+            [os.path.join(root, test) for test in tests],
+            cwd=path, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def run(args=(), shards=None, history_path=HISTORY_PATH, output=OUTPUT_PATH):
+    """
+    Run tests across shards scheduled by duration history, merging results, logs, and
+    screen shots into the output directory. The duration history is updated afterwards.
+
+    :param args: Pytest arguments selecting tests, options are passed on to every shard.
+    :type args: [string, ...]
+    :param shards: Number of shards, defaults to the number of cores.
+    :type shards: int
+    :param history_path: Path of the duration history.
+    :type history_path: string
+    :param output: Output directory.
+    :type output: string
+    :return: int
+    """
+    output = os.path.abspath(output)
+    history_path = os.path.abspath(history_path)
+    history = load_history(history_path)
+    plan = [shard for shard in schedule(
+        collect(args), history, shards or multiprocessing.cpu_count()) if shard[0]]
+    if os.path.exists(output):
+        shutil.rmtree(output)
+    started = time.time()
+    shard_paths = [os.path.join(output, 'shard-{}'.format(index)) for index in range(len(plan))]
+    options = split_args(args)[1]
+    processes = [spawn_shard(path, tests, os.getcwd(), options) \
+        for path, (tests, _) in zip(shard_paths, plan)]
+    code = 0
+    for process in processes:
+        code = max(code, process.wait())
+    for path in shard_paths:
+        durations = os.path.join(path, 'durations.json')
+        if os.path.exists(durations):
+            history.update(load_history(durations))
+    save_history(history, history_path)
+    totals = merge_results([os.path.join(path, 'junit.xml') for path in shard_paths],
+                           os.path.join(output, 'junit.xml'))
+    merge_artifacts(shard_paths, output)
+    print('{tests} tests, {failures} failures, {errors} errors, {skipped} skipped'.format(**totals))
+    print('{} shards, {:.2f}s scheduled per shard at most, {:.2f}s elapsed'.format(
+        len(plan), max([total for _, total in plan] or [0]), time.time() - started))
+    return code
+
+
+def pytest_runtest_logreport(report):
+    """
+    Pytest hook accumulating setup, call, and teardown durations per test.
+    """
+    _DURATIONS[report.nodeid] = _DURATIONS.get(report.nodeid, 0.0) + report.duration
+
+
+def pytest_sessionfinish(session):  # pylint: disable=unused-argument
+    """
+    Pytest hook writing recorded durations to the path given by `PYSCC_DURATIONS`.
+    """
+    path = os.environ.get('PYSCC_DURATIONS')
+    if path:
+        save_history(_DURATIONS, path)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    :return: int
+    """
+    parser = argparse.ArgumentParser(
+        description='Run pyscc suites sharded by test duration.')
+    parser.add_argument('-n', '--shards', type=int, default=None,
+                        help='number of shards, defaults to the number of cores')
+    parser.add_argument('--history', default=HISTORY_PATH, help='path of the duration history')
+    parser.add_argument('--output', default=OUTPUT_PATH, help='directory for merged results')
+    options, args = parser.parse_known_args(argv)
+    return run(args, options.shards, options.history, options.output)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,483 @@
+# Licensed to the Software Freedom Conservancy (SFC) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The SFC licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+# -- in-page tracker for pending fetch/xhr requests and short lived timers
+# installs itself once per document, returns true if freshly installed
+NETWORK_TRACKER = '''
+(function () {
+  if (window.__pysccNetwork) { return false; }
+  var tracker = window.__pysccNetwork = {
+    requests: 0, timers: 0, lastRequest: 0, lastTimer: 0, timerThreshold: 1000, handles: {},
+    setTimeout: window.setTimeout, clearTimeout: window.clearTimeout
+  };
+  function request(delta) {
+    tracker.requests = Math.max(0, tracker.requests + delta);
+    tracker.lastRequest = Date.now();
+  }
+  function timer(id) {
+    if (tracker.handles[id]) {
+      delete tracker.handles[id];
+      tracker.timers = Math.max(0, tracker.timers - 1);
+      tracker.lastTimer = Date.now();
+    }
+  }
+  if (window.fetch) {
+    var fetch = window.fetch;
+    window.fetch = function () {
+      request(1);
+      return fetch.apply(this, arguments).then(
+        function (response) { request(-1); return response; },
+        function (error) { request(-1); throw error; });
+    };
+  }
+  var send = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    var finished = false;
+    function done() { if (!finished) { finished = true; request(-1); } }
+    request(1);
+    this.addEventListener('loadend', done);
+    try { return send.apply(this, arguments); } catch (error) { done(); throw error; }
+  };
+  window.setTimeout = function (callback, delay) {
+    if (typeof callback !== 'function' || (delay || 0) > tracker.timerThreshold) {
+      return tracker.setTimeout.apply(window, arguments);
+    }
+    var args = Array.prototype.slice.call(arguments, 2);
+    var id = tracker.setTimeout.call(window, function () {
+      timer(id);
+      callback.apply(window, args);
+    }, delay);
+    tracker.handles[id] = true;
+    tracker.timers += 1;
+    tracker.lastTimer = Date.now();
+    return id;
+  };
+  window.clearTimeout = function (id) {
+    timer(id);
+    return tracker.clearTimeout.apply(window, arguments);
+  };
+  return true;
+})()
+'''
+
+# -- async script resolving once no requests (and optionally timers) were pending for idle ms
+# arguments: idle ms, timeout ms, include timers, callback
+NETWORK_IDLE = '''
+var idle = arguments[0], timeout = arguments[1], timers = arguments[2];
+var callback = arguments[arguments.length - 1];
+%s;
+var tracker = window.__pysccNetwork, started = Date.now();
+(function poll() {
+  var now = Date.now();
+  var busy = tracker.requests > 0 || (timers && tracker.timers > 0);
+  var last = Math.max(started, tracker.lastRequest, timers ? tracker.lastTimer : 0);
+  if (!busy && now - last >= idle) { return callback(true); }
+  if (now - started >= timeout) { return callback(false); }
+  tracker.setTimeout.call(window, poll, Math.max(10, Math.min(50, idle / 4)));
+})();
+''' % NETWORK_TRACKER
+
+# -- marks the current document ahead of a navigation, returns the current location
+NAVIGATION_MARK = 'window.__pysccNavigation = arguments[0]; return window.location.href;'
+
+# -- ready state of the current document, null while the marked document is still loaded
+NAVIGATION_STATE = 'return window.__pysccNavigation === arguments[0] ? null : document.readyState;'
+
+# -- sets values of form fields through their native setters and notifies frameworks
+# arguments: [[selector or element, value, clear], ...], returns indexes of fields not set
+FILL_FIELDS = '''
+var fields = arguments[0], failed = [];
+function find(target) {
+  if (typeof target !== 'string') { return target; }
+  try {
+    var found = document.querySelector(target);
+    if (found) { return found; }
+  } catch (error) {}
+  try {
+    return document.evaluate(
+      target, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+  } catch (error) { return null; }
+}
+function setter(el, prop) {
+  var protos = [HTMLInputElement, HTMLTextAreaElement, HTMLSelectElement];
+  for (var i = 0; i < protos.length; i++) {
+    if (el instanceof protos[i]) {
+      var descriptor = Object.getOwnPropertyDescriptor(protos[i].prototype, prop);
+      return descriptor && descriptor.set;
+    }
+  }
+  return null;
+}
+for (var i = 0; i < fields.length; i++) {
+  var el = find(fields[i][0]), value = fields[i][1], set;
+  if (el && typeof value === 'boolean' && (el.type === 'checkbox' || el.type === 'radio')) {
+    set = setter(el, 'checked');
+  } else {
+    set = el && setter(el, 'value');
+    value = fields[i][2] ? String(value) : el && el.value + String(value);
+  }
+  if (!set) { failed.push(i); continue; }
+  set.call(el, value);
+  el.dispatchEvent(new Event('input', {bubbles: true}));
+  el.dispatchEvent(new Event('change', {bubbles: true}));
+}
+return failed;
+'''
+
+# -- counts matches of selectors the same way elements are looked up, css first then xpath,
+# timing lookups over a number of runs
+# arguments: [selector, ...], runs, returns [[count or null when invalid, time in ms per run,
+# "css" or "xpath" when matched], ...]
+VERIFY_SELECTORS = '''
+var selectors = arguments[0], runs = arguments[1] || 1, results = [];
+function lookup(selector) {
+  var count = null, engine = null;
+  try { count = document.querySelectorAll(selector).length; engine = 'css'; } catch (error) {}
+  if (!count) {
+    try {
+      count = document.evaluate(selector, document, null,
+        XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotLength;
+      engine = 'xpath';
+    } catch (error) {}
+  }
+  return [count, count ? engine : null];
+}
+for (var i = 0; i < selectors.length; i++) {
+  var started = performance.now(), found;
+  for (var run = 0; run < runs; run++) { found = lookup(selectors[i]); }
+  results.push([found[0], (performance.now() - started) / runs, found[1]]);
+}
+return results;
+'''
+
+# -- version of the in-page helper namespace, bump whenever HELPERS changes
+HELPERS_VERSION = 1
+
+# -- returned by HELPER_CALL when the helper namespace of the expected version is missing
+HELPERS_MISSING = '__pyscc_missing__'
+
+# -- in-page helper namespace, installed once per document
+HELPERS = '''
+(function () {
+  if (window.__pyscc && window.__pyscc.version === %(version)d) { return; }
+  window.__pyscc = {
+    version: %(version)d,
+    visible: function (el) {
+      var rect = el.getBoundingClientRect();
+      return !!(el.offsetWidth || el.offsetHeight || rect.height || rect.width) &&
+        (el.style.visibility === '' || el.style.visibility === 'visible') &&
+        (el.style.opacity ? el.style.opacity > 0 : true);
+    },
+    property: function (el, prop) { return el[prop]; },
+    click: function (el) { el.click(); },
+    scroll: function (el) { el.scrollIntoView(); },
+    trigger: function (elements, events, type, options) {
+      for (var i = 0; i < elements.length; i++) {
+        for (var j = 0; j < events.length; j++) {
+          var event = new window[type || 'Event'](events[j]);
+          for (var key in options || {}) {
+            Object.defineProperty(event, key, {value: options[key], configurable: true});
+          }
+          elements[i].dispatchEvent(event);
+        }
+      }
+    }
+  };
+})();
+''' % {'version': HELPERS_VERSION}
+
+# -- invokes a helper by name with the remaining arguments
+HELPER_CALL = '''
+var helpers = window.__pyscc;
+if (!helpers || helpers.version !== %d) { return '%s'; }
+return helpers[arguments[0]].apply(helpers, Array.prototype.slice.call(arguments, 1));
+''' % (HELPERS_VERSION, HELPERS_MISSING)
+
+# -- serializes a clone of the document annotated with visibility, block layout, disabled, value,
+# and checked state of each element, live elements are left untouched
+SNAPSHOT = HELPERS + '''
+var root = document.documentElement, clone = root.cloneNode(true);
+var live = root.getElementsByTagName('*'), copies = clone.getElementsByTagName('*');
+for (var i = 0; i < live.length; i++) {
+  var el = live[i], copy = copies[i];
+  var visible = window.__pyscc.visible(el);
+  copy.setAttribute('data-pyscc-v', visible ? '1' : '0');
+  if (visible && !/^(inline|contents)/.test(window.getComputedStyle(el).display)) {
+    copy.setAttribute('data-pyscc-b', '1');
+  }
+  if (el.disabled) { copy.setAttribute('data-pyscc-d', '1'); }
+  if (el.checked) { copy.setAttribute('data-pyscc-c', '1'); }
+  if (/^(INPUT|TEXTAREA|SELECT)$/.test(el.tagName)) { copy.setAttribute('data-pyscc-value', el.value); }
+}
+return clone.outerHTML;
+'''
+
+# -- finds the element by the css or xpath `selector` variable of the including script
+FIND_ELEMENT = '''function find() {
+  try {
+    var found = document.querySelector(selector);
+    if (found) { return found; }
+  } catch (error) {}
+  try {
+    return document.evaluate(
+      selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+  } catch (error) { return null; }
+}
+'''
+
+# -- async script resolving with the value of a javascript condition once truthy, `$el` refers to
+# the element by the given selector; the interval is cleared once resolved or timed out
+# arguments: selector, interval ms, timeout ms, callback
+WAIT_JS = '''
+var selector = arguments[0], interval = arguments[1], timeout = arguments[2];
+var callback = arguments[arguments.length - 1], started = Date.now(), handle = null;
+''' + FIND_ELEMENT + '''function poll() {
+  var value = null;
+  try { value = (function ($el) { return (%s); })(find()); } catch (error) {}
+  if (value || Date.now() - started >= timeout) {
+    window.clearInterval(handle);
+    callback(value ? {resolved: true, value: value} : {resolved: false});
+    return true;
+  }
+  return false;
+}
+if (!poll()) { handle = window.setInterval(poll, interval); }
+'''
+
+# -- starts a non blocking wait for a javascript condition, `$el` refers to the element by the
+# given selector; waits are kept by handle in a single registry, resolved waits hold -1
+# arguments: selector, handle, interval ms
+WAIT_JS_START = '''
+var selector = arguments[0], handle = arguments[1], interval = arguments[2];
+var waits = window.__pysccWaits = window.__pysccWaits || {};
+''' + FIND_ELEMENT + '''waits[handle] = window.setInterval(function () {
+  var value = null;
+  try { value = (function ($el) { return (%s); })(find()); } catch (error) {}
+  if (value) {
+    window.clearInterval(waits[handle]);
+    waits[handle] = -1;
+  }
+}, interval);
+'''
+
+# -- status of a non blocking wait, resolved waits are removed from the registry once read
+# arguments: handle
+WAIT_JS_STATUS = '''
+var waits = window.__pysccWaits || {}, resolved = waits[arguments[0]] === -1;
+if (resolved) { delete waits[arguments[0]]; }
+return resolved;
+'''
+
+# -- clears a pending non blocking wait
+# arguments: handle
+WAIT_JS_CLEAR = '''
+var waits = window.__pysccWaits || {};
+window.clearInterval(waits[arguments[0]]);
+delete waits[arguments[0]];
+'''
+
+# -- async script resolving with the current location once it differs from the given one,
+# history changes are observed through hooks installed once per document
+# arguments: last known location, timeout ms, callback
+LOCATION_CHANGE = '''
+var last = arguments[0], timeout = arguments[1], callback = arguments[arguments.length - 1];
+var hooks = window.__pysccLocation;
+if (!hooks) {
+  hooks = window.__pysccLocation = {listeners: []};
+  var notify = function () {
+    var listeners = hooks.listeners;
+    hooks.listeners = [];
+    for (var i = 0; i < listeners.length; i++) { listeners[i](window.location.href); }
+  };
+  ['pushState', 'replaceState'].forEach(function (name) {
+    var original = window.history[name];
+    window.history[name] = function () {
+      var result = original.apply(this, arguments);
+      notify();
+      return result;
+    };
+  });
+  window.addEventListener('popstate', notify);
+  window.addEventListener('hashchange', notify);
+}
+if (window.location.href !== last) { return callback(window.location.href); }
+var timers = window.__pysccNetwork || window;
+var listener = function (href) { timers.clearTimeout.call(window, timer); callback(href); };
+var timer = timers.setTimeout.call(window, function () {
+  var index = hooks.listeners.indexOf(listener);
+  if (index !== -1) { hooks.listeners.splice(index, 1); }
+  callback(window.location.href);
+}, timeout);
+hooks.listeners.push(listener);
+'''
+
+# -- writes local and session storage values, optionally clearing storages first
+# arguments: {key: value} local, {key: value} session, clear
+STATE_LOAD = '''
+var storages = {localStorage: arguments[0], sessionStorage: arguments[1]};
+for (var name in storages) {
+  if (arguments[2]) { window[name].clear(); }
+  for (var key in storages[name]) { window[name].setItem(key, storages[name][key]); }
+}
+'''
+
+# -- reads local and session storage values
+STATE_DUMP = '''
+function copy(storage) {
+  var values = {};
+  for (var i = 0; i < storage.length; i++) { values[storage.key(i)] = storage.getItem(storage.key(i)); }
+  return values;
+}
+return {local: copy(window.localStorage), session: copy(window.sessionStorage)};
+'''
+
+# -- collects text artifacts of a failure: location, title, outer html of the component root
+# (or document), and console logs captured by E2EJS.console_logger
+# arguments: root selector or null
+FAILURE_ARTIFACTS = '''
+var selector = arguments[0], root = null;
+if (selector) {
+  try { root = document.querySelector(selector); } catch (error) {}
+  if (!root) {
+    try {
+      root = document.evaluate(
+        selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    } catch (error) {}
+  }
+}
+return {
+  url: window.location.href,
+  title: document.title,
+  html: (root || document.documentElement).outerHTML,
+  console: typeof console.dump === 'function' ? console.dump() : null
+};
+'''
+
+# -- attribute marking elements matched by a filter, holds space separated filter marks
+FILTER_MARK = 'data-pyscc-match'
+
+# -- marks elements by selector matching text, pattern, attribute, and visibility predicates,
+# marks of the previous filter of the same elements are removed first
+# arguments: selector, mark, {text, textRe: [source, flags], attr, visible, child}, limit
+# returns number of marked elements
+FILTER_ELEMENTS = HELPERS + '''
+var selector = arguments[0], mark = arguments[1], spec = arguments[2], limit = arguments[3];
+var attribute = '%s', found = [], count = 0, i;
+function unmark(el) {
+  var marks = (el.getAttribute(attribute) || '').split(' ').filter(function (value) {
+    return value && value !== mark;
+  });
+  if (marks.length) { el.setAttribute(attribute, marks.join(' ')); } else { el.removeAttribute(attribute); }
+}
+var marked = document.querySelectorAll('[' + attribute + '~="' + mark + '"]');
+for (i = 0; i < marked.length; i++) { unmark(marked[i]); }
+try { found = Array.prototype.slice.call(document.querySelectorAll(selector)); } catch (error) {}
+if (!found.length) {
+  try {
+    var result = document.evaluate(
+      selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (i = 0; i < result.snapshotLength; i++) { found.push(result.snapshotItem(i)); }
+  } catch (error) {}
+}
+var pattern = spec.textRe ? new RegExp(spec.textRe[0], spec.textRe[1]) : null;
+function matches(el) {
+  var target = spec.child ? el.querySelector(spec.child) : el;
+  if (!target) { return false; }
+  var text = (target.innerText || target.textContent || '').replace(/\\s+/g, ' ').trim();
+  if (spec.text !== null && text !== spec.text) { return false; }
+  if (pattern && !pattern.test(text)) { return false; }
+  for (var key in spec.attr || {}) {
+    var expected = spec.attr[key], actual = el.getAttribute(key);
+    if (expected === true ? actual === null : expected === false ? actual !== null :
+        actual !== String(expected)) { return false; }
+  }
+  return spec.visible === null || window.__pyscc.visible(el) === spec.visible;
+}
+for (i = 0; i < found.length && (!limit || count < limit); i++) {
+  if (matches(found[i])) {
+    found[i].setAttribute(attribute, ((found[i].getAttribute(attribute) || '') + ' ' + mark).trim());
+    count += 1;
+  }
+}
+return count;
+''' % FILTER_MARK
+
+# -- async script collecting rows of a virtualized or infinite list, scrolling its container
+# until a batch is collected or the end of the list is reached; rows already collected by the
+# same harvest are skipped by key. fields map names to specs: null for the row's text,
+# "@attribute" for the row's attribute, "selector" or "selector@attribute" for a descendant's
+# arguments: selector, harvest id, {key, fields, container, batch, settle, budget}, callback
+# returns {records: [{name: value}, ...], done}
+HARVEST = '''
+var selector = arguments[0], id = arguments[1], spec = arguments[2];
+var callback = arguments[arguments.length - 1], started = Date.now();
+var harvests = window.__pysccHarvest = window.__pysccHarvest || {};
+var state = harvests[id] = harvests[id] || {seen: {}, stalls: 0};
+var timers = window.__pysccNetwork || window, records = [];
+function rows() {
+  try { return Array.prototype.slice.call(document.querySelectorAll(selector)); } catch (error) {}
+  var found = [];
+  try {
+    var result = document.evaluate(
+      selector, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (var i = 0; i < result.snapshotLength; i++) { found.push(result.snapshotItem(i)); }
+  } catch (error) {}
+  return found;
+}
+function read(row, field) {
+  if (!field) { return (row.innerText || row.textContent || '').trim(); }
+  var at = field.lastIndexOf('@'), target = row;
+  if (at !== 0) {
+    try { target = row.querySelector(at > 0 ? field.slice(0, at) : field); } catch (error) { target = null; }
+    if (!target) { return null; }
+  }
+  return at >= 0 ? target.getAttribute(field.slice(at + 1)) : (target.innerText || target.textContent || '').trim();
+}
+function scroller(row) {
+  if (spec.container) { return document.querySelector(spec.container); }
+  for (var el = row && row.parentElement; el && el !== document.body; el = el.parentElement) {
+    var overflow = window.getComputedStyle(el).overflowY;
+    if (el.scrollHeight > el.clientHeight && (overflow === 'auto' || overflow === 'scroll')) { return el; }
+  }
+  return document.scrollingElement || document.documentElement;
+}
+function step() {
+  var found = rows(), fresh = 0;
+  for (var i = 0; i < found.length && records.length < spec.batch; i++) {
+    var key = read(found[i], spec.key);
+    // rows without a key can not be deduplicated and are skipped
+    if (key === null || state.seen.hasOwnProperty(key)) { continue; }
+    state.seen[key] = true;
+    fresh += 1;
+    var record = {};
+    for (var name in spec.fields) { record[name] = read(found[i], spec.fields[name]); }
+    records.push(record);
+  }
+  if (records.length >= spec.batch) { return callback({records: records, done: false}); }
+  var container = scroller(found[found.length - 1]), before = container && container.scrollTop;
+  if (container) { container.scrollTop = before + Math.max(container.clientHeight, 1); }
+  state.stalls = !fresh && (!container || container.scrollTop === before) ? state.stalls + 1 : 0;
+  // the end is reached once scrolling stalled, allowing time for more rows to be loaded
+  if (state.stalls > 3) { return callback({records: records, done: true}); }
+  if (Date.now() - started >= spec.budget) { return callback({records: records, done: false}); }
+  timers.setTimeout.call(window, step, spec.settle);
+}
+step();
+'''
+
+# -- removes the state of a harvest
+HARVEST_CLEAR = 'delete (window.__pysccHarvest || {})[arguments[0]];'
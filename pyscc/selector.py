@@ -0,0 +1,98 @@
+# Licensed to the Software Freedom Conservancy (SFC) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The SFC licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+from string import Template
+
+
+_TEMPLATES = {}
+
+
+class SelectorTemplate(object):
+    """
+    Parsed selector template, shared by an element definition and all of its formatted clones.
+
+    :param source: Selector template to parse.
+    :type source: string
+    """
+    __slots__ = ('source', 'placeholders', '_segments')
+
+    def __init__(self, source):
+        self.source = source
+        segments = []
+        literal = ''
+        position = 0
+        for match in Template.pattern.finditer(source):
+            literal += source[position:match.start()]
+            position = match.end()
+            name = match.group('named') or match.group('braced')
+            if name:
+                segments.append((literal, name, match.group()))
+                literal = ''
+            elif match.group('escaped') is not None:
+                literal += Template.delimiter
+            else:
+                literal += match.group()
+        segments.append((literal + source[position:], None, None))
+        self._segments = tuple(segments)
+        self.placeholders = frozenset(name for _, name, _ in segments if name)
+
+    def bind(self, values, **kwargs):
+        """
+        Merge new placeholder values into existing ones.
+
+        :param values: Values previously bound to the template.
+        :type values: dict, None
+        :return: dict
+        """
+        unknown = [key for key in kwargs if key not in self.placeholders]
+        if unknown:
+            raise KeyError('Selector "{}" has no placeholder for "{}"'.format(
+                self.source, '", "'.join(sorted(unknown))))
+        merged = dict(values) if values else {}
+        merged.update(kwargs)
+        return merged
+
+    def render(self, values):
+        """
+        Render template with the given values, unbound placeholders are left as is.
+
+        :param values: Placeholder values to substitute.
+        :type values: dict
+        :return: string
+        """
+        if not values:
+            return self.source
+        rendered = []
+        for literal, name, raw in self._segments:
+            rendered.append(literal)
+            if name:
+                rendered.append('%s' % (values[name],) if name in values else raw)
+        return ''.join(rendered)
+
+
+def compile_selector(source):
+    """
+    Fetch parsed selector template, templates are parsed once per definition.
+
+    :param source: Selector template to parse.
+    :type source: string
+    :return: SelectorTemplate
+    """
+    template = _TEMPLATES.get(source)
+    if template is None:
+        template = _TEMPLATES[source] = SelectorTemplate(source)
+    return template
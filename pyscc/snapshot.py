@@ -0,0 +1,267 @@
+# Licensed to the Software Freedom Conservancy (SFC) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The SFC licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import json
+import re
+
+from six import string_types, text_type
+
+try:
+    from cssselect import HTMLTranslator, SelectorError
+    from lxml import etree, html
+except ImportError:  # pragma: no cover
+    html = None
+
+
+VISIBLE = 'data-pyscc-v'
+BLOCK = 'data-pyscc-b'
+DISABLED = 'data-pyscc-d'
+CHECKED = 'data-pyscc-c'
+VALUE = 'data-pyscc-value'
+
+WHITESPACE = re.compile(r'[ \t\r\n\f]+')
+ANNOTATIONS = re.compile(r' data-pyscc-(?:v|b|d|c|value)="[^"]*"')
+
+
+class SnapshotNode(object):
+    """
+    Element of a DOM snapshot, stands in for a WebElement while a snapshot is active.
+
+    :param node: Parsed element.
+    :type node: lxml.html.HtmlElement
+    """
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        self.node = node
+
+    def __eq__(self, other):
+        return isinstance(other, SnapshotNode) and other.node is self.node
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.node)
+
+    @property
+    def text(self):
+        """
+        Visible text of the element, whitespace is collapsed and block elements are
+        separated by line breaks.
+
+        :return: string
+        """
+        if not self.visible:
+            return ''
+        parts = []
+        self.__collect_text(self.node, parts)
+        lines = (line.strip() for line in ''.join(parts).split('\n'))
+        return '\n'.join(line for line in lines if line)
+
+    @classmethod
+    def __collect_text(cls, node, parts):
+        if node.text:
+            parts.append(WHITESPACE.sub(' ', node.text))
+        for child in node:
+            if isinstance(child.tag, string_types) and child.tag not in ('script', 'style') \
+                    and child.get(VISIBLE) != '0':
+                block = child.tag == 'br' or child.get(BLOCK) == '1'
+                if block:
+                    parts.append('\n')
+                cls.__collect_text(child, parts)
+                if block:
+                    parts.append('\n')
+            if child.tail:
+                parts.append(WHITESPACE.sub(' ', child.tail))
+
+    @property
+    def visible(self):
+        """
+        Visibility of the element when the snapshot was taken.
+
+        :return: bool
+        """
+        return self.node.get(VISIBLE) == '1'
+
+    @property
+    def inner_html(self):
+        """
+        Inner html of the element without snapshot annotations.
+
+        :return: string
+        """
+        content = (self.node.text or '') + ''.join(
+            html.tostring(child, encoding=text_type) for child in self.node)
+        return ANNOTATIONS.sub('', content)
+
+    @property
+    def outer_html(self):
+        """
+        Outer html of the element without snapshot annotations.
+
+        :return: string
+        """
+        return ANNOTATIONS.sub('', html.tostring(
+            self.node, encoding=text_type, with_tail=False))
+
+    def get_property(self, prop):
+        """
+        Property of the element when the snapshot was taken.
+
+        :param prop: Property of element to target.
+        :type prop: string
+        :return: None, bool, string
+        """
+        reader = PROPERTY_READERS.get(prop)
+        return reader(self) if reader else self.node.get(prop)
+
+    def get_attribute(self, attribute):
+        """
+        Attribute of the element with javascript values converted to python types.
+
+        :param attribute: Attribute of element to target.
+        :type attribute: string
+        :return: None, bool, int, float, string
+        """
+        value = self.node.get(attribute)
+        if value in ('true', 'false'):
+            return value == 'true'
+        if value is not None and value.replace('.', '', 1).isdigit():
+            try:
+                return json.loads(value)
+            except ValueError:  # not a json number, such as "007" or "1."
+                return value
+        return value
+
+    def __write(self, *args, **kwargs):
+        raise RuntimeError('Elements can not be modified while a snapshot is active')
+
+    clear = send_keys = click = submit = __write
+
+
+PROPERTY_READERS = {
+    'disabled': lambda element: element.node.get(DISABLED) == '1',
+    'checked': lambda element: element.node.get(CHECKED) == '1',
+    'selected': lambda element: 'selected' in element.node.attrib,
+    'value': lambda element: element.node.get(VALUE, element.node.get('value')),
+    'innerText': lambda element: element.text,
+    'textContent': lambda element: element.node.text_content(),
+    'innerHTML': lambda element: element.inner_html,
+    'outerHTML': lambda element: element.outer_html,
+    'tagName': lambda element: element.node.tag.upper(),
+    'className': lambda element: element.node.get('class', '')
+}
+
+
+class Snapshot(object):
+    """
+    Point in time copy of a document, answers element reads without browser round trips.
+
+    :Warning: Requires the lxml and cssselect packages.
+    :param source: Annotated html of the document.
+    :type source: string
+    :param frame_path: Frame the snapshot was taken in.
+    :type frame_path: (string, ...)
+    """
+    def __init__(self, source, frame_path=()):
+        if html is None:
+            raise ImportError('Snapshots require lxml and cssselect, install "pyscc[snapshot]"')
+        self.root = html.document_fromstring(source)
+        self.frame_path = frame_path
+        self.translator = HTMLTranslator()
+        self.cache = {}
+
+    def covers(self, frame):
+        """
+        Check elements declared in the given frame can be read from the snapshot.
+
+        :param frame: Declared frame of a component.
+        :type frame: (string, ...), None
+        :return: bool
+        """
+        return frame is None or frame == self.frame_path
+
+    def find_all(self, selector):
+        """
+        Find elements by css selector, falling back to xpath.
+
+        :param selector: Selector of elements.
+        :type selector: string
+        :return: [SnapshotNode, ...]
+        """
+        found = self.cache.get(selector)
+        if found is None:
+            found = []
+            try:
+                found = self.root.xpath(self.translator.css_to_xpath(selector))
+            except SelectorError:
+                pass
+            if not found:
+                try:
+                    found = self.root.xpath(selector)
+                except etree.XPathError:  # pylint: disable=c-extension-no-member
+                    found = []
+            found = self.cache[selector] = [
+                SnapshotNode(node) for node in found if isinstance(node, html.HtmlElement)]
+        return found
+
+
+class SnapshotJS(object):
+    """
+    Javascript utilities answering reads of snapshot elements locally, other calls are
+    forwarded to the live utilities.
+
+    :param js: Live javascript utilities.
+    :type js: E2EJS
+    """
+    def __init__(self, js):
+        self.js = js  # pylint: disable=invalid-name
+
+    def __getattr__(self, name):
+        return getattr(self.js, name)
+
+    def is_visible(self, element):  # pylint: disable=missing-docstring
+        if isinstance(element, SnapshotNode):
+            return element.visible
+        return self.js.is_visible(element)
+
+    def get_property(self, element, prop):  # pylint: disable=missing-docstring
+        if isinstance(element, SnapshotNode):
+            return element.get_property(prop)
+        return self.js.get_property(element, prop)
+
+    def get_attribute(self, element, attribute, convert_type=True):  # pylint: disable=missing-docstring
+        if isinstance(element, SnapshotNode):
+            return element.get_attribute(attribute) if convert_type \
+                else element.node.get(attribute)
+        return self.js.get_attribute(element, attribute, convert_type)
+
+    def get_value(self, element):  # pylint: disable=missing-docstring
+        return self.get_property(element, 'value')
+
+    def get_text(self, element):  # pylint: disable=missing-docstring
+        return self.get_property(element, 'innerText')
+
+    def get_raw_text(self, element):  # pylint: disable=missing-docstring
+        return self.get_property(element, 'innerHTML')
+
+    def __write(self, *args, **kwargs):
+        raise RuntimeError('Elements can not be modified while a snapshot is active')
+
+    set_attribute = remove_attribute = set_property = click = dbl_click = select = deselect = \
+        trigger_event = scroll_into_view = __write
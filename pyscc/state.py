@@ -0,0 +1,106 @@
+# Licensed to the Software Freedom Conservancy (SFC) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The SFC licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import io
+import json
+import os
+
+from six import iteritems, string_types, text_type
+
+from pyscc.scripts import STATE_DUMP, STATE_LOAD
+from pyscc.service import Service
+from pyscc.tracer import traced
+
+
+class State(Service):
+    """
+    Service loading and capturing the local storage, session storage, and cookies of the
+    current origin, used to skip ui setup flows.
+
+    State is represented as a dictionary:
+
+        {'local': {key: value}, 'session': {key: value}, 'cookies': [cookie, ...]}
+    """
+
+    @staticmethod
+    def __storage(values):
+        return {key: value if isinstance(value, string_types) else json.dumps(value)
+                for key, value in iteritems(values or {})}
+
+    @traced('state')
+    def load(self, state, route=None, clear=False):
+        """
+        Write storage values in a single script and add cookies to the current origin.
+
+        :param state: State to load, or path to a json file of one.
+        :type state: dict, string
+        :param route: Route to navigate to once loaded, the page should be reloaded for
+            the application to pick up loaded state.
+        :type route: string
+        :param clear: Clear existing storage values and cookies first.
+        :type clear: bool
+        :return: State
+        """
+        if isinstance(state, string_types):
+            with io.open(state, 'r', encoding='utf-8') as source:
+                state = json.load(source)
+        self.browser.execute_script(
+            STATE_LOAD, self.__storage(state.get('local')), self.__storage(state.get('session')),
+            clear)
+        if clear:
+            self.browser.delete_all_cookies()
+        for cookie in state.get('cookies') or ():
+            cookie = dict(cookie)
+            if 'expiry' in cookie:
+                cookie['expiry'] = int(cookie['expiry'])
+            self.browser.add_cookie(cookie)
+        if route is not None:
+            self.controller.navigate(route)
+        return self
+
+    @traced('state')
+    def dump(self, path=None):
+        """
+        Capture storage values and cookies of the current origin.
+
+        :param path: Path to write the state to as json.
+        :type path: string
+        :return: dict
+        """
+        state = self.browser.execute_script(STATE_DUMP)
+        state['cookies'] = self.browser.get_cookies()
+        if path:
+            self.write(state, path)
+        return state
+
+    @staticmethod
+    def write(state, path):
+        """
+        Write state to a json file.
+
+        :param state: State to write.
+        :type state: dict
+        :param path: Path of the json file.
+        :type path: string
+        :return: string
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with io.open(path, 'w', encoding='utf-8') as target:
+            target.write(text_type(json.dumps(state, indent=2)))
+        return path
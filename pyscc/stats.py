@@ -0,0 +1,165 @@
+# Licensed to the Software Freedom Conservancy (SFC) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The SFC licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import io
+import json
+import math
+import os
+import time
+
+from six import iteritems, text_type
+
+
+_STATS = {}
+
+
+class WaitStats(object):
+    """
+    Observed durations of waits until their conditions were met, persisted as json and used to
+    adapt polling of later waits.
+
+    :param path: Path of the stats file.
+    :type path: string
+    """
+
+    _SAMPLES_ = 100  # most recent durations kept per wait
+    _MIN_INTERVAL_ = 0.02
+    _MAX_INTERVAL_ = 1
+    _BACKOFF_FACTOR_ = 1.5
+
+    def __init__(self, path):
+        self.path = path
+        self.waits = self.__read()
+        self.pending = {}
+
+    @classmethod
+    def shared(cls, path):
+        """
+        Fetch stats of a given file, stats are loaded once per process.
+
+        :param path: Path of the stats file.
+        :type path: string
+        :return: WaitStats
+        """
+        stats = _STATS.get(path)
+        if stats is None:
+            stats = _STATS[path] = cls(path)
+        return stats
+
+    def __read(self):
+        if not os.path.exists(self.path):
+            return {}
+        with io.open(self.path, 'r', encoding='utf-8') as source:
+            return json.load(source)
+
+    def __merge(self, waits, key, entry):
+        merged = waits.setdefault(key, {'samples': [], 'timeout': 0, 'timed_out': 0})
+        merged['samples'] = (merged['samples'] + entry['samples'])[-self._SAMPLES_:]
+        merged['timeout'] = max(merged['timeout'], entry['timeout'])
+        merged['timed_out'] += entry['timed_out']
+
+    def record(self, key, duration, timeout):
+        """
+        Record the outcome of a wait.
+
+        :param key: Wait identifier.
+        :type key: string
+        :param duration: Time in seconds until the condition was met, None if timed out.
+        :type duration: float
+        :param timeout: Timeout of the wait in seconds.
+        :type timeout: int, float
+        """
+        entry = {'samples': [] if duration is None else [round(duration, 4)],
+                 'timeout': timeout, 'timed_out': int(duration is None)}
+        self.__merge(self.waits, key, entry)
+        self.__merge(self.pending, key, entry)
+
+    def percentile(self, key, percent):
+        """
+        Nearest rank percentile of observed durations.
+
+        :param key: Wait identifier.
+        :type key: string
+        :param percent: Percentile, 0 to 100.
+        :type percent: int, float
+        :return: float, None without observations
+        """
+        samples = sorted(self.waits.get(key, {}).get('samples') or ())
+        if not samples:
+            return None
+        return samples[max(int(math.ceil(percent / 100.0 * len(samples))) - 1, 0)]
+
+    def intervals(self, key):
+        """
+        Polling intervals of a wait; polls often until twice the expected (p50) duration
+        has passed and backs off afterwards.
+
+        :param key: Wait identifier.
+        :type key: string
+        :return: generator
+        """
+        started = time.time()
+        expected = self.percentile(key, 50)
+        if expected is None:
+            fast, until = 0.1, 0
+        else:
+            fast = min(max(expected / 10, self._MIN_INTERVAL_), self._MAX_INTERVAL_)
+            until = expected * 2
+        interval = fast
+        while True:
+            if time.time() - started >= until:
+                interval = min(interval * self._BACKOFF_FACTOR_, self._MAX_INTERVAL_)
+            yield interval
+
+    def report(self, factor=4):
+        """
+        Flag waits whose timeouts are far above their observed p99 duration.
+
+        :param factor: Ratio of timeout to p99 above which a wait is flagged.
+        :type factor: int, float
+        :return: [dict, ...], sorted by ratio
+        """
+        flagged = []
+        for key, entry in iteritems(self.waits):
+            p99 = self.percentile(key, 99)
+            if p99 is None or entry['timeout'] <= factor * max(p99, self._MIN_INTERVAL_):
+                continue
+            flagged.append({
+                'wait': key, 'timeout': entry['timeout'], 'p50': self.percentile(key, 50),
+                'p99': p99, 'samples': len(entry['samples']), 'timed_out': entry['timed_out']})
+        return sorted(flagged, key=lambda row: row['p99'] / row['timeout'])
+
+    def save(self):
+        """
+        Merge recorded outcomes into the stats file, outcomes recorded by other processes
+        since the file was read are kept.
+
+        :return: string
+        """
+        if not self.pending:
+            return self.path
+        waits = self.__read()
+        for key, entry in iteritems(self.pending):
+            self.__merge(waits, key, entry)
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with io.open(self.path, 'w', encoding='utf-8') as target:
+            target.write(text_type(json.dumps(waits, indent=2, sort_keys=True)))
+        self.waits = waits
+        self.pending = {}
+        return self.path
@@ -0,0 +1,179 @@
+# Licensed to the Software Freedom Conservancy (SFC) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The SFC licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import io
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from six import text_type
+
+
+_ACTIVE = threading.local()  # tracer spans of the current thread are recorded to
+
+
+class Tracer(object):
+    """
+    Records spans of pyscc operations and webdriver commands as chrome trace events.
+    Traces can be loaded in Perfetto or chrome://tracing. Operations of objects belonging to a
+    controller are recorded to the controller's tracer, others, such as class level calls, to the
+    tracer started in the current thread.
+
+    :param name: Name of the trace, defaults to the current pytest test if available.
+    :type name: string
+    """
+
+    def __init__(self, name=None):
+        self.name = name or self.current_test()
+        self.events = []
+        self.pid = os.getpid()
+
+    @staticmethod
+    def current_test():
+        """
+        Fetch the node id of the running pytest test, if any.
+
+        :return: string, None
+        """
+        test = os.environ.get('PYTEST_CURRENT_TEST')
+        return test.rsplit(' ', 1)[0] if test else None
+
+    @staticmethod
+    def current():
+        """
+        Fetch the tracer spans of the current thread are recorded to.
+
+        :return: Tracer, None
+        """
+        return getattr(_ACTIVE, 'tracer', None)
+
+    @contextmanager
+    def span(self, name, category, args=None):
+        """
+        Record a span for the duration of the context.
+
+        :param name: Name of the span.
+        :type name: string
+        :param category: Category of the span.
+        :type category: string
+        :param args: Additional details to attach to the span.
+        :type args: dict
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.events.append({
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': int(start * 1e6),
+                'dur': int((time.time() - start) * 1e6),
+                'pid': self.pid,
+                'tid': threading.current_thread().ident,
+                'args': args or {}
+            })
+
+    def instrument(self, browser):
+        """
+        Record spans for every command sent by the given webdriver.
+
+        :param browser: Webdriver instance to instrument.
+        :type browser: WebDriver
+        :return: WebDriver
+        """
+        execute = browser.execute
+
+        def traced_execute(driver_command, params=None):
+            with self.span(driver_command, 'webdriver'):
+                return execute(driver_command, params)
+
+        browser.execute = traced_execute
+        return browser
+
+    def start(self):
+        """
+        Make this tracer the one spans of the current thread are recorded to.
+
+        :return: Tracer
+        """
+        _ACTIVE.tracer = self
+        return self
+
+    def stop(self):
+        """
+        Stop recording spans of the current thread to this tracer.
+
+        :return: Tracer
+        """
+        if Tracer.current() is self:
+            _ACTIVE.tracer = None
+        return self
+
+    def dump(self, path='traces/'):
+        """
+        Write recorded events as chrome trace event json.
+
+        :param path: Directory to drop the trace in.
+        :type path: string
+        :return: string
+        """
+        if not os.path.exists(path):
+            os.makedirs(path)
+        name = re.sub(r'[^\w.-]+', '_', self.name) if self.name else str(time.time())
+        trace_path = os.path.join(path, '{}.trace.json'.format(name))
+        with io.open(trace_path, 'w', encoding='utf-8') as trace:
+            trace.write(text_type(json.dumps({
+                'traceEvents': self.events,
+                'displayTimeUnit': 'ms',
+                'otherData': {'name': self.name}
+            })))
+        return trace_path
+
+
+def traced(category):
+    """
+    Decorator recording a span for each call while a tracer is active, the tracer is active
+    in the current thread for the duration of the call so nested calls are recorded to it.
+
+    :param category: Category of the span.
+    :type category: string
+    :return: callable
+    """
+    def decorator(method):  # pylint: disable=missing-docstring
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):  # pylint: disable=missing-docstring
+            target = getattr(self, 'element', None) or getattr(self, 'elements', None) or self
+            previous = Tracer.current()
+            tracer = getattr(getattr(target, 'controller', target), 'tracer', None) or previous
+            if tracer is None:
+                return method(self, *args, **kwargs)
+            owner = self if isinstance(self, type) else self.__class__
+            selector = getattr(target, 'selector', None)
+            _ACTIVE.tracer = tracer
+            try:
+                with tracer.span('{}.{}'.format(owner.__name__, method.__name__), category,
+                                 {'selector': selector} if selector else None):
+                    return method(self, *args, **kwargs)
+            finally:
+                _ACTIVE.tracer = previous
+        return wrapper
+    return decorator
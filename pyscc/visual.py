@@ -0,0 +1,130 @@
+# Licensed to the Software Freedom Conservancy (SFC) under one
+# or more contributor license agreements.  See the NOTICE file
+# distributed with this work for additional information
+# regarding copyright ownership.  The SFC licenses this file
+# to you under the Apache License, Version 2.0 (the
+# "License"); you may not use this file except in compliance
+# with the License.  You may obtain a copy of the License at
+#
+#   http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing,
+# software distributed under the License is distributed on an
+# "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+# KIND, either express or implied.  See the License for the
+# specific language governing permissions and limitations
+# under the License.
+
+import io
+import os
+
+try:
+    import numpy
+    from PIL import Image
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+_BASELINES = {}
+
+
+def decode(png):
+    """
+    Decode a png into an array of rgb pixels.
+
+    :Warning: Requires the numpy and Pillow packages.
+    :param png: Png image data.
+    :type png: bytes
+    :return: numpy.ndarray
+    """
+    if numpy is None:
+        raise ImportError('Visual assertions require numpy and Pillow, install "pyscc[visual]"')
+    return numpy.asarray(Image.open(io.BytesIO(png)).convert('RGB'))
+
+
+def load_baseline(path):
+    """
+    Fetch decoded baseline, baselines are decoded once until the file changes.
+
+    :param path: Path of the baseline png.
+    :type path: string
+    :return: numpy.ndarray, None
+    """
+    if not os.path.exists(path):
+        return None
+    modified = os.path.getmtime(path)
+    cached = _BASELINES.get(path)
+    if cached is None or cached[0] != modified:
+        with open(path, 'rb') as baseline:
+            cached = _BASELINES[path] = (modified, decode(baseline.read()))
+    return cached[1]
+
+
+def save_image(pixels, path):
+    """
+    Write an array of rgb pixels as png.
+
+    :param pixels: Pixels to write.
+    :type pixels: numpy.ndarray
+    :param path: Path of the png.
+    :type path: string
+    :return: string
+    """
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory)
+    Image.fromarray(pixels).save(path)
+    _BASELINES.pop(path, None)
+    return path
+
+
+def compare(actual, baseline, threshold=0, ignore=None):
+    """
+    Find pixels differing between two images, a pixel differs when any of its channels
+    differ by more than the threshold.
+
+    :param actual: Captured pixels.
+    :type actual: numpy.ndarray
+    :param baseline: Expected pixels.
+    :type baseline: numpy.ndarray
+    :param threshold: Per channel difference tolerated, 0 to 255.
+    :type threshold: int
+    :param ignore: Regions to ignore as (x, y, width, height) tuples or rect dictionaries.
+    :type ignore: [tuple or dict, ...]
+    :return: (float, numpy.ndarray), ratio of differing pixels and mask of differing pixels,
+        the mask is None when image sizes differ
+    """
+    if actual.shape != baseline.shape:
+        return 1.0, None
+    difference = numpy.abs(actual.astype(numpy.int16) - baseline.astype(numpy.int16))
+    mask = difference.max(axis=2) > threshold
+    for region in ignore or ():
+        if isinstance(region, dict):
+            region = (region['x'], region['y'], region['width'], region['height'])
+        left, top, width, height = (int(round(value)) for value in region)
+        mask[max(top, 0):max(top + height, 0), max(left, 0):max(left + width, 0)] = False
+    return float(numpy.count_nonzero(mask)) / mask.size, mask
+
+
+def diff_image(actual, baseline, mask):
+    """
+    Render differing pixels in red over a faded copy of the captured image.
+
+    :param actual: Captured pixels.
+    :type actual: numpy.ndarray
+    :param baseline: Expected pixels.
+    :type baseline: numpy.ndarray
+    :param mask: Mask of differing pixels, None when image sizes differ.
+    :type mask: numpy.ndarray
+    :return: numpy.ndarray
+    """
+    if mask is None:
+        # sizes differ, show both images side by side
+        height = max(actual.shape[0], baseline.shape[0])
+        canvas = numpy.zeros((height, actual.shape[1] + baseline.shape[1], 3), dtype=numpy.uint8)
+        canvas[:baseline.shape[0], :baseline.shape[1]] = baseline
+        canvas[:actual.shape[0], baseline.shape[1]:] = actual
+        return canvas
+    rendered = (actual // 3 + 170).astype(numpy.uint8)
+    rendered[mask] = (255, 0, 0)
+    return rendered
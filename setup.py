@@ -22,5 +22,9 @@ setup(
         'pyseleniumjs==1.3.8',
         'six'
     ],
+    extras_require={
+        'snapshot': ['lxml', 'cssselect'],
+        'visual': ['numpy', 'Pillow']
+    },
     packages=['pyscc']
 )
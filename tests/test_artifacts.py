@@ -0,0 +1,81 @@
+import json
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+from unittest import TestCase
+
+from pyscc.artifacts import ArtifactWriter
+from tests.utils import BaseTest
+from selenium.common.exceptions import ElementNotVisibleException
+
+
+class TestArtifactWriter(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_artifact_writer(self):
+        """test bundles are written in the background as zip archives"""
+        writer = ArtifactWriter()
+        path = os.path.join(self.path, 'nested', 'failure.zip')
+        self.assertEqual(writer.submit(path, [
+            ('page.html', '<html></html>'), ('screenshot.png', b'\x89PNG')]), path)
+        writer.flush()
+        with zipfile.ZipFile(path) as bundle:
+            self.assertEqual(bundle.read('page.html'), b'<html></html>')
+            self.assertEqual(bundle.getinfo('screenshot.png').compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(bundle.getinfo('page.html').compress_type, zipfile.ZIP_DEFLATED)
+
+    def test_artifact_writer_errors(self):
+        """test failing bundles are logged without stopping the writer"""
+        writer = ArtifactWriter()
+        errors = []
+        writer.logger = logging.getLogger('pyscc.artifacts.test')
+        writer.logger.error = lambda *args: errors.append(args)
+        path = os.path.join(self.path, 'failure.zip')
+        writer.submit(os.path.join(self.path, 'broken.zip'), [('page.html', None)])
+        writer.flush()
+        self.assertEqual(len(errors), 1)
+        writer.submit(path, [(u'page.html', u'<p>\u00e9t\u00e9</p>')])
+        writer.flush()
+        with zipfile.ZipFile(path) as bundle:
+            self.assertEqual(bundle.read('page.html').decode('utf-8'), u'<p>\u00e9t\u00e9</p>')
+
+
+class TestFailureArtifacts(BaseTest):
+
+    def setUp(self):
+        super(TestFailureArtifacts, self).setUp()
+        self.path = tempfile.mkdtemp()
+        self.app._FAILURE_ARTIFACTS_ = self.path
+
+    def tearDown(self):
+        super(TestFailureArtifacts, self).tearDown()
+        shutil.rmtree(self.path)
+
+    def test_failure_artifacts(self):
+        """test failing waits attach the path of a bundle of failure artifacts"""
+        self.app.js.console_logger()
+        with self.assertRaises(ElementNotVisibleException) as failure:
+            self.app.components.home.task.fmt(id='missing').wait_visible(1, error=True)
+        path = failure.exception.artifact_path
+        self.assertTrue(path.startswith(self.path))
+        with self.assertRaises(ElementNotVisibleException) as again:
+            self.app.components.home.task.fmt(id='missing').wait_visible(1, error=True)
+        self.assertNotEqual(again.exception.artifact_path, path)
+        self.app.artifact_writer.flush()
+        with zipfile.ZipFile(path) as bundle:
+            self.assertIn('screenshot.png', bundle.namelist())
+            self.assertIn('console.json', bundle.namelist())
+            self.assertIn('<html', bundle.read('page.html').decode('utf-8'))
+            details = json.loads(bundle.read('failure.json').decode('utf-8'))
+        self.assertEqual(details['name'], 'HomePage.wait_visible')
+        self.assertEqual(details['url'], self.app.location)
+        with self.assertRaises(RuntimeError) as failure:
+            self.app.wait_location('missing', timeout=1, error=True)
+        self.assertTrue(failure.exception.artifact_path.startswith(self.path))
@@ -1,6 +1,8 @@
-from tests.utils import BaseTest
+from pyscc import component_element
+from tests.utils import BaseTest, Framed, HomePage
 
 from selenium import webdriver
+from selenium.common.exceptions import NoSuchElementException
 
 
 class TestComponent(BaseTest):
@@ -32,3 +34,82 @@ class TestComponent(BaseTest):
             'create_task_title', 'delete_tasks_button', 'logo', 'task'])
         self.assertListEqual(description['elements'], ['task_assignees', 'tasks'])
         self.assertListEqual(description['group'], ['task_form', 'task_group'])
+
+    def test_component_registry(self):
+        """test component registry is built per class and inherited"""
+        self.assertEqual(HomePage.__registry__['logo'], 'element')
+        self.assertEqual(HomePage.__registry__['tasks'], 'elements')
+        self.assertEqual(HomePage.__registry__['task_group'], 'group')
+
+        class ExtendedHomePage(HomePage):
+            logo = None
+
+            @component_element
+            def title(self):
+                return 'h1'
+
+        description = ExtendedHomePage(self.app).__describe__
+        self.assertNotIn('logo', description['element'])
+        self.assertIn('title', description['element'])
+        self.assertIn('create_task_title', description['element'])
+        self.assertListEqual(description['group'], ['task_form', 'task_group'])
+        self.assertNotIn('title', HomePage.__registry__)
+
+    def test_component_verify(self):
+        """test component selectors are verified in a single script"""
+        report = self.app.components.home.verify()
+        self.assertEqual(report['selectors']['logo']['count'], 1)
+        self.assertEqual(report['selectors']['logo']['selector'], 'body header-partial h1.logo')
+        self.assertIn('task', report['skipped'])
+        self.assertIn('task_group.desc', report['skipped'])
+        self.assertListEqual(report['invalid'], [])
+        report = self.app.components.home.verify({'id': 1, 'form': 'form', 'class_name': 'x'})
+        self.assertListEqual(report['skipped'], [])
+        self.assertIn('task_group.desc', report['selectors'])
+
+    def test_component_profile(self):
+        """test component selectors are ranked by lookup cost"""
+        profile = self.app.components.home.profile(runs=5)
+        times = [entry['time'] for entry in profile]
+        self.assertEqual(times, sorted(times, reverse=True))
+        logo = [entry for entry in profile if entry['name'] == 'logo'][0]
+        self.assertEqual(logo['selector'], 'body header-partial h1.logo')
+        self.assertEqual(logo['count'], 1)
+        self.assertEqual(logo['engine'], 'css')
+        self.assertEqual(len(self.app.components.home.profile(runs=1, top=2)), 2)
+
+    def test_component_verify_error(self):
+        """test component verification errors on invalid and unmatched selectors"""
+
+        class BrokenHomePage(HomePage):
+
+            @component_element
+            def broken(self):
+                return '#logo[['
+
+            @component_element
+            def renamed(self):
+                return '#renamed-logo'
+
+        report = BrokenHomePage(self.app).verify()
+        self.assertListEqual(report['invalid'], ['broken'])
+        self.assertIn('renamed', report['missing'])
+        with self.assertRaises(NoSuchElementException):
+            BrokenHomePage(self.app).verify(error=True)
+
+    def test_component_frame(self):
+        """test component element lookups run in the component's declared frame or frame scope"""
+        self.add_frame()
+        framed = Framed(self.app)
+        self.assertEqual(framed.inner.text(), 'pyscc')
+        self.assertEqual(self.app.frame_path, ('iframe#pyscc-frame',))
+        with self.app.frame(None):
+            self.assertEqual(self.app.frame_path, ())
+            self.assertTrue(framed.inner.check.available())
+            self.assertEqual(self.app.frame_path, ('iframe#pyscc-frame',))
+        self.assertEqual(self.app.frame_path, ('iframe#pyscc-frame',))
+        self.assertTrue(self.app.components.home.logo.check.available())
+        self.assertEqual(self.app.frame_path, ())
+        with self.app.frame('iframe#pyscc-frame'):
+            self.assertFalse(self.app.components.home.logo.check.available())
+            self.assertEqual(self.app.frame_path, ('iframe#pyscc-frame',))
@@ -1,12 +1,30 @@
 import datetime
+from unittest import skipIf
 from uuid import uuid4
 
-from pyscc.element import Element, Elements
-from pyscc.resource import Resource
+from pyscc.connection import pool_connections
+from pyscc.element import Element, Elements, Check
+from pyscc.resource import BaseResource, Resource
 from tests.utils import BaseTest
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.common.exceptions import NoSuchElementException, ElementNotVisibleException, \
-    InvalidElementStateException
+    InvalidElementStateException, TimeoutException
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+def traced_size(factory, count=1000):
+    """measure average traced memory allocated per created object"""
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    created = [factory() for _ in range(count)]
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del created
+    return float(size) / count
 
 
 class TestElement(BaseTest):
@@ -43,10 +61,31 @@ class TestElement(BaseTest):
 
     def test_element_group_fmt(self):
         """test element groups format selectors as intended"""
-        self.assertEqual(self.task_form.fmt(form='create-todo'), self.task_form)
-        self.assertEqual(self.task_form.assignee.selector, 'body create-todo #taskAssignee')
-        self.task_form.title.fmt(class_name='u-full-width')
-        self.assertEqual(self.task_form.title.selector, 'body create-todo #taskTitle.u-full-width')
+        task_form = self.task_form.fmt(form='create-todo')
+        self.assertIsNot(task_form, self.task_form)
+        self.assertEqual(task_form.__group__, self.task_form.__group__)
+        self.assertEqual(task_form.assignee.selector, 'body create-todo #taskAssignee')
+        self.assertEqual(self.task_form.assignee.selector, 'body ${form} #taskAssignee')
+        title = task_form.title.fmt(class_name='u-full-width')
+        self.assertEqual(title.selector, 'body create-todo #taskTitle.u-full-width')
+        with self.assertRaises(KeyError):
+            self.task_form.fmt(id=1)
+
+    def test_element_group_fill(self):
+        """test element groups fill form fields in bulk"""
+        task_form = self.task_form.fmt(form='create-todo')
+        values = {'assignee': str(uuid4()), 'content': str(uuid4())}
+        self.assertEqual(task_form.fill(values), task_form)
+        self.assertEqual(task_form.assignee.value(), values['assignee'])
+        self.assertEqual(task_form.content.value(), values['content'])
+        self.assertEqual(task_form.fill({'assignee': '-native'}, native=['assignee'], clear=False),
+                         task_form)
+        self.assertEqual(task_form.assignee.value(), values['assignee'] + '-native')
+        with self.assertRaises(KeyError):
+            task_form.fill({'description': 'foobar'})
+        with self.app.snapshot():
+            with self.assertRaises(RuntimeError):
+                task_form.fill(values)
 
     def test_element_group_root(self):
         """test element group root element"""
@@ -69,6 +108,59 @@ class TestElement(BaseTest):
             self.assertIsInstance(task.get(), WebElement)
             self.assertEqual(task.fmt(id=str(uuid4())).get(), None)
 
+    def test_element_wrapper_fmt_clone(self):
+        """test element wrapper selector formatting returns clones sharing the parsed template"""
+        task = self.task.fmt(id=1)
+        self.assertIsNot(task, self.task)
+        self.assertIs(task.template, self.task.template)
+        self.assertEqual(task.selector, 'body todo-task#task-1')
+        self.assertEqual(self.task.selector, 'body todo-task#task-${id}')
+        self.assertEqual(self.task.template.placeholders, frozenset(['id']))
+        self.assertIs(self.app.components.home.task.template, self.task.template)
+        with self.assertRaises(KeyError):
+            self.task.fmt(uid=1)
+        tasks = self.tasks.fmt()
+        self.assertIsNot(tasks, self.tasks)
+        self.assertEqual(tasks.selector, self.tasks.selector)
+
+    def test_element_wrapper_slots(self):
+        """test element wrapper is compact and creates checks lazily"""
+        self.assertFalse(hasattr(self.logo, '__dict__'))
+        self.assertFalse(hasattr(self.logo.check, '__dict__'))
+        self.assertFalse(hasattr(self.tasks, '__dict__'))
+        self.assertFalse(hasattr(self.tasks.checks, '__dict__'))
+        element = Element(self.app, self.app.components.home, 'h1')
+        self.assertIsNone(element._check)
+        self.assertIs(element.check, element.check)
+        self.assertIsInstance(element.check, Check)
+
+    @skipIf(tracemalloc is None, 'tracemalloc not available')
+    def test_element_wrapper_memory(self):
+        """test element wrapper uses less memory than an equivalent dict based object"""
+        class DictElement(object):  # pylint: disable=too-few-public-methods
+            def __init__(self, controller, component, selector):
+                self.controller = controller
+                self.component = component
+                self.selector = self._selector = selector
+                self.check = Resource(element=self)
+                self.wait_handle = None
+
+        home = self.app.components.home
+        compact = traced_size(lambda: Element(self.app, home, 'h1'))
+        loose = traced_size(lambda: DictElement(self.app, home, 'body h1'))
+        self.assertLess(compact, loose)
+
+    def test_element_wrapper_validation(self):
+        """test element wrapper validation can be toggled globally"""
+        home = self.app.components.home
+        with self.assertRaises(ValueError):
+            Element(None, home, 'h1')
+        BaseResource._VALIDATE_ = False
+        try:
+            self.assertIsInstance(Element(None, home, 'h1'), Element)
+        finally:
+            BaseResource._VALIDATE_ = True
+
     def test_element_wrapper_wait(self):
         """test element wrapper wait"""
         self.assertEqual(self.logo.wait_for(timeout=1), self.logo)
@@ -101,14 +193,38 @@ class TestElement(BaseTest):
 
     def test_element_wrapper_js_wait(self):
         """test element wrapper javascript wait"""
-        self.task.fmt(id=2)
+        task = self.task.fmt(id=2)
         self.assertEqual(
             self.delete_tasks.wait_js(
                 '$el.getAttribute("class").indexOf("is-danger") == -1', 50), self.delete_tasks)
         self.assertFalse(self.delete_tasks.check.wait_status())
-        self.task.get().click()
+        task.get().click()
         self.assertTrue(self.app.wait(timeout=5, condition=self.delete_tasks.check.wait_status))
 
+    def test_element_wrapper_js_wait_block(self):
+        """test element wrapper blocking javascript wait returns the condition value"""
+        logo = self.app.components.home.logo
+        self.assertEqual(logo.wait_js('$el.tagName', block=True, timeout=1), 'H1')
+        self.app.browser.execute_script(
+            'setTimeout(function () { document.title = "pyscc"; }, 200)')
+        self.assertEqual(
+            logo.wait_js('document.title == "pyscc" && $el.tagName', block=True), 'H1')
+        with self.assertRaises(TimeoutException):
+            logo.wait_js('$el.tagName == "P"', block=True, timeout=1)
+
+    def test_element_wrapper_js_wait_cleanup(self):
+        """test element wrapper clears pending javascript waits and caches resolved status"""
+        logo = self.app.components.home.logo
+        logo.wait_js('$el.tagName == "P"', 50)
+        pending = logo.wait_handle
+        logo.wait_js('$el.tagName == "H1"', 50)
+        waits = 'return Object.keys(window.__pysccWaits)'
+        self.assertNotIn(pending, self.app.browser.execute_script(waits))
+        self.assertTrue(self.app.wait(timeout=5, condition=logo.check.wait_status))
+        self.assertIs(logo.wait_handle, True)
+        self.assertTrue(logo.check.wait_status())
+        self.assertListEqual(self.app.browser.execute_script(waits), [])
+
     def test_element_wrapper_attribute(self):
         """test element wrapper get set attribute"""
         self.assertEqual(self.logo.set_attribute(attribute='some', value='value'), self.logo)
@@ -130,6 +246,18 @@ class TestElement(BaseTest):
         self.create_task_assignee.send_input(random_str)
         self.assertEqual(self.create_task_assignee.value(), random_str)
 
+    def test_element_wrapper_send_input_fast(self):
+        """test element wrapper send input through native value setters"""
+        random_str = str(uuid4())
+        self.assertEqual(self.create_task_assignee.send_input(random_str, mode='fast'),
+                         self.create_task_assignee)
+        self.assertEqual(self.create_task_assignee.value(), random_str)
+        self.create_task_assignee.send_input(random_str, clear=False, mode='fast')
+        self.assertEqual(self.create_task_assignee.value(), random_str + random_str)
+        self.assertEqual(self.task.fmt(id=str(uuid4())).send_input(random_str, mode='fast'), None)
+        with self.assertRaises(ValueError):
+            self.create_task_assignee.send_input(random_str, mode='instant')
+
     def test_element_wrapper_get_text(self):
         """test element wrapper get text"""
         self.assertEqual(self.create_task_assignee_label.text(), 'Assignee')
@@ -139,8 +267,14 @@ class TestElement(BaseTest):
     def test_element_wrapper_trigger_event(self):
         """test element wrapper trigger event"""
         self.delete_tasks.trigger_event('click', 'MouseEvent', {'bubbles': True})
-        self.task.fmt(id=2)
-        self.assertTrue(self.app.wait(timeout=5, condition=self.task.check.not_available))
+        task = self.task.fmt(id=2)
+        self.assertTrue(self.app.wait(timeout=5, condition=task.check.not_available))
+
+    def test_element_wrapper_wait_idle(self):
+        """test element wrapper actions waiting for the network to be idle"""
+        self.assertEqual(self.delete_tasks.click(wait_idle=True), self.delete_tasks)
+        self.assertTrue(self.app.browser.execute_script('return !!window.__pysccNetwork'))
+        self.assertEqual(self.task.fmt(id=str(uuid4())).click(wait_idle=True), None)
 
     def test_element_wrapper_scroll_to(self):
         """test element wrapper scroll to"""
@@ -209,6 +343,57 @@ class TestElement(BaseTest):
         for task in self.tasks.text(raw=True):
             self.assertIn('href="/#!/profile', task)
 
+    def test_elements_wrapper_concurrent_reads(self):
+        """test elements wrapper concurrent reads preserve element order"""
+        self.app.wait(timeout=1)  # wait for transitions
+        texts = self.tasks.text()
+        rects = self.tasks.rect()
+        pool_connections(self.app.browser, pool_size=3)
+        self.app._CONCURRENCY_ = 3
+        self.assertEqual(self.tasks.text(), texts)
+        self.assertEqual(self.tasks.rect(), rects)
+        self.assertIsNotNone(self.app.thread_pool)
+        self.assertEqual(self.tasks.read(lambda element: element.tag_name), ['todo-task'] * 3)
+
+    def test_elements_wrapper_filter(self):
+        """test elements wrapper filters and finds elements in the page"""
+        self.app.wait(timeout=1)  # wait for transitions
+        assignees = self.app.components.home.task_assignees.text()
+        self.assertEqual(self.tasks.filter(text_re='2017').count(), 3)
+        self.assertEqual(self.tasks.filter(attr={'foobar': True}).count(), 0)
+        matched = self.tasks.filter(child='#assignee', text=assignees[1])
+        self.assertEqual(matched.count(), assignees.count(assignees[1]))
+        self.assertIsInstance(matched, Elements)
+        first = self.tasks.first(visible=True)
+        self.assertIsInstance(first, Element)
+        self.assertEqual(first.text(), self.tasks.text()[0])
+        self.assertIsNone(self.tasks.first(text='pyscc missing task'))
+        for assignee in assignees:
+            self.assertEqual(self.tasks.filter(child='#assignee', text=assignee).count(),
+                             assignees.count(assignee))
+        self.assertListEqual(sorted(set(self.app.browser.execute_script(
+            'return Array.prototype.map.call(document.querySelectorAll("[data-pyscc-match]"), \
+            function (el) { return el.getAttribute("data-pyscc-match").split(" ").length; })'))),
+                             [1])
+        with self.app.snapshot():
+            with self.assertRaises(RuntimeError):
+                self.tasks.filter(visible=True)
+
+    def test_elements_wrapper_harvest(self):
+        """test elements wrapper harvests rows in deduplicated batches"""
+        self.app.wait(timeout=1)  # wait for transitions
+        batches = list(self.tasks.harvest(
+            key='@id', fields={'id': '@id', 'assignee': '#assignee'}, batch_size=2))
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+        rows = [row for batch in batches for row in batch]
+        self.assertEqual(len(set(row['id'] for row in rows)), 3)
+        self.assertEqual([row['assignee'] for row in rows],
+                         self.app.components.home.task_assignees.text())
+        self.assertEqual(list(self.tasks.harvest(max_items=1)), [[{'text': self.tasks.text()[0]}]])
+        self.assertEqual(list(self.tasks.harvest(key='@data-missing')), [])
+        self.assertFalse(self.app.browser.execute_script(
+            'return Object.keys(window.__pysccHarvest).length'))
+
     def test_elements_wrapper_attributes(self):
         """test elements wrapper attribute aggregation and specification"""
         self.app.wait(timeout=1)  # wait for transitions
@@ -0,0 +1,145 @@
+import gzip
+import io
+import json
+import socket
+import threading
+import time
+from unittest import TestCase
+
+from selenium import webdriver
+from selenium.webdriver.remote.command import Command
+from six.moves import socketserver
+from six.moves.BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from pyscc.connection import PooledRemoteConnection, pool_connections
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """stand-in webdriver server answering every command over keep-alive connections"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def respond(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        self.server.connections.add(self.client_address)
+        self.server.commands.append(self.command)
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        if self.path.endswith('/session'):
+            payload = {'sessionId': 'stand-in', 'status': 0, 'value': {}}
+        elif self.path.endswith('/execute'):
+            payload = {'sessionId': 'stand-in', 'status': 0, 'value': 'x' * 4096}
+        else:
+            payload = {'sessionId': 'stand-in', 'status': 0, 'value': None}
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json;charset=UTF-8')
+        if 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+            buffer = io.BytesIO()
+            with gzip.GzipFile(fileobj=buffer, mode='wb') as compressed:
+                compressed.write(body)
+            body = buffer.getvalue()
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # close the connection once answered, as servers do with idle connections
+        self.close_connection = self.server.drop
+
+    do_GET = do_POST = do_DELETE = respond
+
+
+class StandInServer(socketserver.ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StandInHandler)
+        self.connections = set()
+        self.commands = []
+        self.delay = 0
+        self.drop = False
+
+
+class TestPooledRemoteConnection(TestCase):
+
+    def setUp(self):
+        self.server = StandInServer()
+        self.url = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+        threading.Thread(target=self.server.serve_forever).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connection_reuse(self):
+        """test commands reuse a single keep-alive connection"""
+        connection = PooledRemoteConnection(self.url)
+        for _ in range(5):
+            self.assertEqual(connection.execute(Command.STATUS, {})['status'], 0)
+        self.assertEqual(connection.metrics['requests'], 5)
+        self.assertEqual(connection.metrics['connections'], 1)
+        self.assertEqual(connection.metrics['reused'], 4)
+        self.assertEqual(len(self.server.connections), 1)
+        connection.close()
+
+    def test_connection_stale(self):
+        """test commands on idle connections closed by the server are resent"""
+        self.server.drop = True
+        connection = PooledRemoteConnection(self.url)
+        self.assertEqual(connection.execute(Command.STATUS, {})['status'], 0)
+        time.sleep(0.1)
+        self.assertEqual(connection.execute(Command.STATUS, {})['status'], 0)
+        self.assertListEqual(self.server.commands, ['GET', 'GET'])
+        self.assertEqual(connection.metrics['connections'], 2)
+        connection.close()
+
+    def test_connection_timeout(self):
+        """test timed out commands are not resent"""
+        connection = PooledRemoteConnection(self.url, read_timeout=0.2)
+        self.assertEqual(connection.execute(Command.STATUS, {})['status'], 0)
+        self.server.delay = 0.5
+        with self.assertRaises(socket.timeout):
+            connection.execute(
+                Command.EXECUTE_SCRIPT, {'sessionId': 'stand-in', 'script': '', 'args': []})
+        time.sleep(0.5)
+        self.assertListEqual(self.server.commands, ['GET', 'POST'])
+        connection.close()
+
+    def test_connection_pool_size(self):
+        """test concurrent commands open no more connections than the pool size"""
+        connection = PooledRemoteConnection(self.url, pool_size=2)
+        threads = [threading.Thread(target=connection.execute, args=(Command.STATUS, {})) \
+            for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(connection.metrics['requests'], 8)
+        self.assertLessEqual(connection.metrics['connections'], 2)
+        connection.close()
+
+    def test_connection_compression(self):
+        """test compressed responses are decoded when compression is enabled"""
+        connection = PooledRemoteConnection(self.url, compress=True)
+        response = connection.execute(
+            Command.EXECUTE_SCRIPT, {'sessionId': 'stand-in', 'script': '', 'args': []})
+        self.assertEqual(response['value'], 'x' * 4096)
+        self.assertEqual(connection.metrics['compressed'], 1)
+        connection.close()
+
+    def test_connection_webdriver(self):
+        """test pooled connections are installed on a webdriver with its commands intact"""
+        driver = webdriver.Remote(command_executor=self.url, desired_capabilities={})
+        commands = dict(driver.command_executor._commands)  # pylint: disable=protected-access
+        pool_connections(driver, pool_size=2, compress=True)
+        self.assertIsInstance(driver.command_executor, PooledRemoteConnection)
+        self.assertDictEqual(driver.command_executor._commands, commands)  # pylint: disable=protected-access
+        self.assertEqual(driver.execute_script('return 1'), 'x' * 4096)
+        driver.refresh()
+        self.assertEqual(driver.command_executor.metrics['reused'], 1)
+        driver.quit()
@@ -1,4 +1,10 @@
 import os
+import re
+import time
+from uuid import uuid4
+
+from selenium.common.exceptions import NoSuchFrameException, TimeoutException
+from pyscc.scripts import HELPERS_VERSION
 from tests.utils import BaseTest, HomePage
 
 
@@ -25,11 +31,45 @@ class TestController(BaseTest):
         self.assertTrue(self.app.wait(
             timeout=5, condition=lambda: home.tasks.count() == 1))
 
+    def test_controller_wait_network_idle(self):
+        """test controller network idle wait"""
+        self.assertTrue(self.app.track_network())
+        self.assertFalse(self.app.track_network())
+        self.app.browser.execute_script(
+            'window.setTimeout(function () { window.pysccIdle = true; }, 500);')
+        self.assertTrue(self.app.wait_network_idle(idle_ms=100, timeout=5))
+        self.assertTrue(self.app.browser.execute_script('return window.pysccIdle'))
+        self.app.browser.execute_script(
+            'window.pysccLoop = function () { window.setTimeout(window.pysccLoop, 50); }; \
+            window.pysccLoop();')
+        self.assertFalse(self.app.wait_network_idle(idle_ms=100, timeout=1))
+        with self.assertRaises(TimeoutException):
+            self.app.wait_network_idle(idle_ms=100, timeout=1, error=True)
+        self.assertTrue(self.app.wait_network_idle(idle_ms=100, timeout=5, timers=False))
+
     def test_controller_navigate(self):
         """test controller navigation"""
         self.app.navigate('notfound')
         self.assertEqual(self.app.location, self.app_url + 'notfound')
 
+    def test_controller_navigate_ready(self):
+        """test controller navigation with readiness strategies"""
+        self.assertTrue(self.app.navigate('notfound', ready='dom'))
+        self.assertEqual(self.app.location, self.app_url + 'notfound')
+        self.assertTrue(self.app.navigate('', ready='idle', timeout=10))
+        self.assertTrue(self.app.navigate(
+            '', ready='component', element=self.app.components.home.create_task_title))
+        self.assertFalse(self.app.navigate(
+            'notfound', ready='component', timeout=1,
+            element=self.app.components.home.task.fmt(id=str(uuid4()))))
+        with self.assertRaises(TimeoutException):
+            self.app.navigate('notfound', ready='component', timeout=1, error=True,
+                              element=self.app.components.home.task.fmt(id=str(uuid4())))
+        with self.assertRaises(ValueError):
+            self.app.navigate('notfound', ready='component')
+        with self.assertRaises(ValueError):
+            self.app.navigate('notfound', ready='load')
+
     def test_controller_is_location(self):
         """test controller is_location"""
         self.app.navigate('notfound')
@@ -50,6 +90,21 @@ class TestController(BaseTest):
         self.assertIn('notfound', str(err.exception))
         self.assertIn(self.app.location, str(err.exception))
 
+    def test_controller_wait_location(self):
+        """test controller wait_location resolves on history changes and regex routes"""
+        self.app.browser.execute_script(
+            'setTimeout(function () { history.pushState({}, "", "#!/task/12"); }, 200)')
+        started = time.time()
+        self.assertTrue(self.app.wait_location(re.compile(r'task/\d+$'), timeout=5))
+        self.assertLess(time.time() - started, 1)
+        self.assertTrue(self.app.is_location(re.compile(r'.*#!/task/12'), strict=True))
+        self.assertFalse(self.app.is_location(re.compile(r'task'), strict=True))
+        self.assertFalse(self.app.wait_location('notfound', timeout=0.5))
+        with self.assertRaises(RuntimeError):
+            self.app.wait_location(re.compile(r'notfound'), timeout=0.5, error=True)
+        self.app.navigate('notfound')
+        self.assertTrue(self.app.wait_location('notfound', timeout=1))
+
     def test_controller_env(self):
         """test controller env resource is properly created"""
         self.assertTrue(hasattr(self.app, 'env'))
@@ -112,3 +167,64 @@ class TestController(BaseTest):
             app.navigate('notfound')
         with self.assertRaises(Exception):
             self.app.navigate('notfound')
+
+    def test_controller_frame(self):
+        """test controller frame context management"""
+        self.add_frame()
+        self.assertEqual(self.app.frame_path, ())
+        with self.app.frame('iframe#pyscc-frame') as app:
+            self.assertEqual(app.frame_path, ('iframe#pyscc-frame',))
+            self.assertEqual(app.browser.find_element_by_css_selector('#inner').text, 'pyscc')
+            with self.app.frame(None):
+                self.assertEqual(app.frame_path, ())
+            self.assertEqual(app.frame_path, ('iframe#pyscc-frame',))
+        self.assertEqual(self.app.frame_path, ())
+        with self.assertRaises(NoSuchFrameException):
+            with self.app.frame('iframe#missing'):
+                pass
+        self.app.refresh()
+        self.assertEqual(self.app.frame_path, ())
+
+    def test_controller_frame_switches(self):
+        """test controller only issues frame switches when the frame path differs"""
+        self.add_frame()
+        switches = []
+        switch_to = self.app.browser.switch_to
+        frame, parent_frame = switch_to.frame, switch_to.parent_frame
+        switch_to.frame = lambda ref: switches.append(ref) or frame(ref)
+        switch_to.parent_frame = lambda: switches.append(None) or parent_frame()
+        self.app.switch_to_frame(['iframe#pyscc-frame'])
+        self.app.switch_to_frame(['iframe#pyscc-frame'])
+        self.assertEqual(len(switches), 1)
+        self.app.switch_to_frame([])
+        self.app.switch_to_frame([])
+        self.assertEqual(len(switches), 2)
+        self.assertIsNone(switches[1])
+
+    def test_verify_components(self):
+        """test controller verifies selectors of all components"""
+        report = self.app.verify_components(samples={'id': 1})
+        self.assertEqual(report['selectors']['home.logo']['count'], 1)
+        self.assertIn('home.task_group.desc', report['selectors'])
+        self.assertIn('home.task_form.title', report['skipped'])
+        self.assertListEqual(report['invalid'], [])
+
+    def test_profile_selectors(self):
+        """test controller ranks selectors of all components and given selectors by cost"""
+        profile = self.app.profile_selectors(samples={'id': 1}, runs=5)
+        self.assertIn('home.logo', [entry['name'] for entry in profile])
+        profile = self.app.profile_selectors([
+            ('css', 'todo-task', None), ('xpath', '//todo-task', None)], runs=5)
+        self.assertEqual(sorted(entry['engine'] for entry in profile), ['css', 'xpath'])
+        self.assertTrue(all(entry['count'] == 3 for entry in profile))
+
+    def test_controller_js_helpers(self):
+        """test js helpers are installed once per document and reinstalled after navigation"""
+        helpers = 'return window.__pyscc && window.__pyscc.version'
+        self.app.navigate('/')
+        self.assertIsNone(self.app.browser.execute_script(helpers))
+        self.assertTrue(self.app.components.home.logo.check.visible())
+        self.assertEqual(self.app.browser.execute_script(helpers), HELPERS_VERSION)
+        self.app.browser.execute_script('window.__pyscc.version = 0')
+        self.assertEqual(self.app.components.home.logo.get_property('tagName'), 'H1')
+        self.assertEqual(self.app.browser.execute_script(helpers), HELPERS_VERSION)
@@ -0,0 +1,171 @@
+import time
+from unittest import TestCase
+
+from selenium.common.exceptions import ElementNotVisibleException, NoSuchElementException, \
+    StaleElementReferenceException, TimeoutException
+from pyscc import Controller
+from pyscc.resource import Resource
+from pyscc.retry import RetryPolicy
+from tests.utils import BaseTest, HomePage
+
+
+class Flaky(object):
+
+    def __init__(self, failures, result=True):
+        self.failures = failures
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise StaleElementReferenceException('stale element')
+        return self.result
+
+
+class FlakyWait(Flaky):
+
+    def __init__(self, failures, timed_out=False):
+        super(FlakyWait, self).__init__(failures, result=None if timed_out else True)
+        self.timeouts = []
+
+    def __call__(self, timeout):
+        self.timeouts.append(timeout)
+        if self.result is None:
+            time.sleep(timeout)
+            raise NoSuchElementException('timed out')
+        return super(FlakyWait, self).__call__()
+
+
+class StubBrowser(object):
+    """stand-in webdriver finding only the given selectors, found elements are visible"""
+
+    def __init__(self, selectors):
+        self.selectors = selectors
+
+    def find_element_by_css_selector(self, selector):
+        if selector not in self.selectors:
+            raise NoSuchElementException(selector)
+        return selector
+
+    find_element_by_xpath = find_element_by_css_selector
+
+    @staticmethod
+    def is_visible(_):
+        return True
+
+
+class StubController(Controller):
+    """controller without a webdriver session"""
+
+    def __init__(self, *selectors):  # pylint: disable=super-init-not-called
+        self.browser = self.js = StubBrowser(selectors)
+        self.env = Resource()
+        self.frame_path = self.frame_scope = ()
+        self.dom_snapshot = None
+        self.tracer = None
+
+
+class TestRetryPolicy(TestCase):
+
+    def test_retry_recovers(self):
+        """test transient failures are retried and recorded"""
+        policy = RetryPolicy(attempts=3, backoff=0.01)
+        operation = Flaky(2)
+        self.assertTrue(policy.run('flaky', operation))
+        self.assertEqual(operation.calls, 3)
+        self.assertEqual(policy.metrics['flaky']['retries'], 2)
+        self.assertEqual(policy.metrics['flaky']['failures'], 0)
+
+    def test_retry_attempts(self):
+        """test failures are raised once attempts are exhausted"""
+        policy = RetryPolicy(attempts=2, backoff=0.01)
+        operation = Flaky(5)
+        with self.assertRaises(StaleElementReferenceException):
+            policy.run('flaky', operation)
+        self.assertEqual(operation.calls, 2)
+        self.assertEqual(policy.metrics['flaky']['failures'], 1)
+
+    def test_retry_budget(self):
+        """test no retries are started once the time budget is spent"""
+        policy = RetryPolicy(attempts=10, backoff=0.05, budget=0.12)
+        operation = Flaky(10)
+        with self.assertRaises(StaleElementReferenceException):
+            policy.run('flaky', operation)
+        self.assertEqual(operation.calls, 2)
+
+    def test_retry_exceptions(self):
+        """test only retryable exceptions and, optionally, None results are retried"""
+        policy = RetryPolicy(attempts=3, backoff=0.01, exceptions=(TimeoutException,))
+        operation = Flaky(1)
+        with self.assertRaises(StaleElementReferenceException):
+            policy.run('flaky', operation)
+        self.assertEqual(operation.calls, 1)
+        policy = RetryPolicy(attempts=3, backoff=0.01, on_none=True)
+        operation = Flaky(0, result=None)
+        self.assertIsNone(policy.run('none', operation))
+        self.assertEqual(operation.calls, 3)
+        self.assertEqual(policy.metrics['none']['failures'], 1)
+
+    def test_retry_wait(self):
+        """test waits are retried within their timeout and not retried once timed out"""
+        policy = RetryPolicy(attempts=3, backoff=0.01, on_none=True)
+        wait = FlakyWait(1)
+        self.assertTrue(policy.run_wait('wait', wait, 1))
+        self.assertEqual(len(wait.timeouts), 2)
+        self.assertTrue(wait.timeouts[1] < 1)
+        wait = FlakyWait(0, timed_out=True)
+        with self.assertRaises(NoSuchElementException):
+            policy.run_wait('timed_out', wait, 0.05)
+        self.assertEqual(len(wait.timeouts), 1)
+        self.assertIsNone(policy.run_wait('none', lambda timeout: None, 1))
+        self.assertEqual(policy.metrics['none']['retries'], 0)
+
+    def test_retry_wait_budget(self):
+        """test the time budget caps the timeout of waits"""
+        policy = RetryPolicy(attempts=3, backoff=0.01, budget=0.2)
+        wait = FlakyWait(0, timed_out=True)
+        started = time.time()
+        with self.assertRaises(NoSuchElementException):
+            policy.run_wait('wait', wait, 10)
+        self.assertTrue(time.time() - started < 0.5)
+        self.assertTrue(wait.timeouts[0] <= 0.2)
+
+
+class TestElementWaitRetry(TestCase):
+
+    def test_element_wait_retry(self):
+        """test element waits run within their timeout under a retry policy"""
+        controller = StubController('body header-partial h1.logo')
+        policy = controller._RETRY_ = RetryPolicy(attempts=3, backoff=0.01, on_none=True)
+        home = HomePage(controller)
+        self.assertEqual(home.logo.wait_visible(5).selector, home.logo.selector)
+        started = time.time()
+        self.assertIsNone(home.task.fmt(id=404).wait_for(1))
+        with self.assertRaises(ElementNotVisibleException):
+            home.task.fmt(id=404).wait_visible(0.5, error=True)
+        self.assertLess(time.time() - started, 2)
+        self.assertEqual(policy.metrics['Element.wait_for']['retries'], 0)
+        self.assertEqual(policy.metrics['Element.wait_visible']['calls'], 2)
+        self.assertEqual(policy.metrics['Element.wait_visible']['failures'], 1)
+
+
+class RetryingHomePage(HomePage):
+
+    __retry__ = RetryPolicy(attempts=3, backoff=0.01, on_none=True)
+
+
+class TestElementRetry(BaseTest):
+
+    def test_element_retry(self):
+        """test element actions and waits use per call, component, and controller policies"""
+        home = RetryingHomePage(self.app)
+        self.assertIsNone(home.task.fmt(id=404).click())
+        self.assertEqual(RetryingHomePage.__retry__.metrics['Element.click']['retries'], 2)
+        self.assertIsNone(home.task.fmt(id=404).click(retry=False))
+        self.assertEqual(RetryingHomePage.__retry__.metrics['Element.click']['calls'], 1)
+        policy = self.app._RETRY_ = RetryPolicy(attempts=2, backoff=0.01, on_none=True)
+        self.assertIsNotNone(self.app.components.home.logo.wait_visible(5))
+        self.assertIsNone(self.app.components.home.task.fmt(id=404).wait_for(1))
+        self.assertEqual(policy.metrics['Element.wait_visible']['retries'], 0)
+        self.assertEqual(policy.metrics['Element.wait_for']['retries'], 0)
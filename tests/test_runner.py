@@ -0,0 +1,116 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+from pyscc.runner import load_history, run, save_history, schedule, split_args
+
+
+SAMPLE_TESTS = '''
+import os
+import time
+from unittest import TestCase
+
+
+class TestSample(TestCase):
+
+    def test_slow(self):
+        time.sleep(0.2)
+        os.makedirs('logs')
+        with open('logs/slow.log', 'w') as log:
+            log.write('slow')
+
+    def test_fast(self):
+        pass
+
+    def test_failing(self):
+        self.fail('expected failure')
+'''
+
+
+OPTION_TESTS = '''
+def check_option():
+    pass
+'''
+
+
+class TestRunner(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.cwd = os.getcwd()
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.root)
+
+    def run_shards(self, args):
+        """run shards able to import pyscc from the working directory the tests started in"""
+        python_path = os.environ.get('PYTHONPATH')
+        os.environ['PYTHONPATH'] = self.cwd
+        try:
+            return run(args, shards=2, history_path='history.json', output='target')
+        finally:
+            if python_path is None:
+                del os.environ['PYTHONPATH']
+            else:
+                os.environ['PYTHONPATH'] = python_path
+
+    def test_runner_schedule(self):
+        """test tests are scheduled longest first onto the least loaded shard"""
+        history = {'a': 10.0, 'b': 6.0, 'c': 5.0, 'd': 4.0, 'e': 1.0}
+        plan = schedule(sorted(history), history, 2)
+        self.assertListEqual(plan, [(['a', 'd'], 14.0), (['b', 'c', 'e'], 12.0)])
+
+    def test_runner_schedule_unknown(self):
+        """test tests without history are scheduled with the median known duration"""
+        plan = schedule(['a', 'b', 'new'], {'a': 1.0, 'b': 3.0}, 3)
+        self.assertListEqual(sorted(total for _, total in plan), [1.0, 3.0, 3.0])
+        self.assertEqual(len(schedule(['a'], {}, 4)), 4)
+
+    def test_runner_history(self):
+        """test duration history round trips to disk"""
+        path = os.path.join(self.root, 'history.json')
+        self.assertDictEqual(load_history(path), {})
+        save_history({'test': 1.5}, path)
+        self.assertDictEqual(load_history(path), {'test': 1.5})
+
+    def test_runner_run(self):
+        """test shards run in parallel and results, logs, and durations are merged"""
+        os.makedirs(os.path.join(self.root, 'tests'))
+        with open(os.path.join(self.root, 'tests', 'test_sample.py'), 'w') as sample:
+            sample.write(SAMPLE_TESTS)
+        os.chdir(self.root)
+        code = self.run_shards(['tests'])
+        self.assertEqual(code, 1)
+        with open('history.json') as history:
+            self.assertEqual(len(json.load(history)), 3)
+        self.assertTrue(os.path.exists(os.path.join('target', 'junit.xml')))
+        self.assertListEqual(
+            [name for name in os.listdir(os.path.join('target', 'logs'))
+             if name.endswith('_slow.log')], ['shard-0_slow.log'])
+        with open(os.path.join('target', 'output.log')) as output:
+            self.assertIn('expected failure', output.read())
+
+    def test_runner_split_args(self):
+        """test test selections are separated from pytest options"""
+        os.makedirs(os.path.join(self.root, 'tests'))
+        open(os.path.join(self.root, 'tests', 'test_sample.py'), 'w').close()
+        open(os.path.join(self.root, 'pytest.ini'), 'w').close()
+        os.chdir(self.root)
+        self.assertEqual(split_args(
+            ['-x', 'tests/test_sample.py::TestSample', '-c', 'pytest.ini', '--base-url', 'url',
+             'tests']), (['tests/test_sample.py::TestSample', 'tests'],
+                         ['-x', '-c', os.path.abspath('pytest.ini'), '--base-url', 'url']))
+
+    def test_runner_options(self):
+        """test pytest options given to the runner are passed on to every shard"""
+        os.makedirs(os.path.join(self.root, 'tests'))
+        with open(os.path.join(self.root, 'tests', 'test_options.py'), 'w') as sample:
+            sample.write(OPTION_TESTS)
+        os.chdir(self.root)
+        code = self.run_shards(['tests', '-o', 'python_functions=check_*'])
+        self.assertEqual(code, 0)
+        with open('history.json') as history:
+            self.assertListEqual(list(json.load(history)), ['tests/test_options.py::check_option'])
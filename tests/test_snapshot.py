@@ -0,0 +1,68 @@
+from unittest import TestCase
+
+from pyscc.snapshot import Snapshot
+from tests.utils import BaseTest
+
+
+SOURCE = '''<html data-pyscc-v="1"><body data-pyscc-v="1" data-pyscc-b="1">
+<div id="list" data-pyscc-v="1" data-pyscc-b="1">
+  <p class="task" data-pyscc-v="1" data-pyscc-b="1">First <b data-pyscc-v="1">task</b></p>
+  <p class="task" data-pyscc-v="0">Second task</p>
+</div>
+<input id="title" value="default" data-pyscc-value="typed" data-pyscc-d="1" data-pyscc-v="1"
+  data-count="2" data-code="007" data-ratio="1.">
+</body></html>'''
+
+
+class TestSnapshot(TestCase):
+
+    def setUp(self):
+        self.snapshot = Snapshot(SOURCE)
+
+    def test_snapshot_find(self):
+        """test snapshot finds elements by css and xpath selectors"""
+        self.assertEqual(len(self.snapshot.find_all('p.task')), 2)
+        self.assertEqual(len(self.snapshot.find_all('//p[@class="task"]')), 2)
+        self.assertListEqual(self.snapshot.find_all('p.missing'), [])
+        self.assertIs(self.snapshot.find_all('p.task'), self.snapshot.find_all('p.task'))
+
+    def test_snapshot_reads(self):
+        """test snapshot answers text, visibility, property, and attribute reads"""
+        first, second = self.snapshot.find_all('p.task')
+        self.assertEqual(first.text, 'First task')
+        self.assertEqual(second.text, '')
+        self.assertTrue(first.visible)
+        self.assertFalse(second.visible)
+        self.assertEqual(self.snapshot.find_all('#list')[0].text, 'First task')
+        self.assertEqual(first.get_property('innerHTML'), 'First <b>task</b>')
+        field = self.snapshot.find_all('#title')[0]
+        self.assertEqual(field.get_property('value'), 'typed')
+        self.assertTrue(field.get_property('disabled'))
+        self.assertEqual(field.get_attribute('data-count'), 2)
+        self.assertEqual(field.get_attribute('data-code'), '007')
+        self.assertEqual(field.get_attribute('data-ratio'), '1.')
+        with self.assertRaises(RuntimeError):
+            field.send_keys('text')
+
+
+class TestControllerSnapshot(BaseTest):
+
+    def test_controller_snapshot(self):
+        """test element reads within a snapshot match live reads without round trips"""
+        home = self.app.components.home
+        live = (home.logo.text(), home.logo.check.visible(), home.tasks.count(),
+                home.create_task_title.get_attribute('id'))
+        commands = []
+        execute = self.app.browser.execute
+        self.app.browser.execute = lambda command, params=None: \
+            commands.append(command) or execute(command, params)
+        with self.app.snapshot():
+            del commands[:]
+            self.assertEqual((
+                home.logo.text(), home.logo.check.visible(), home.tasks.count(),
+                home.create_task_title.get_attribute('id')), live)
+            self.assertListEqual(commands, [])
+            with self.assertRaises(RuntimeError):
+                home.logo.click()
+        self.assertIsNone(self.app.dom_snapshot)
+        self.assertTrue(home.logo.check.visible())
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+
+from selenium import webdriver
+from tests.utils import BaseTest
+
+
+class TestState(BaseTest):
+
+    def setUp(self):
+        super(TestState, self).setUp()
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        super(TestState, self).tearDown()
+        shutil.rmtree(self.path)
+
+    def test_state_load(self):
+        """test storage values and cookies are loaded in bulk"""
+        self.app.state.load({
+            'local': {'user': 'pyscc', 'settings': {'theme': 'dark'}},
+            'session': {'token': 'abc'},
+            'cookies': [{'name': 'pyscc', 'value': 'cookie'}]
+        })
+        self.assertEqual(self.app.browser.execute_script("return localStorage.getItem('user')"), 'pyscc')
+        self.assertEqual(self.app.browser.execute_script(
+            "return localStorage.getItem('settings')"), '{"theme": "dark"}')
+        self.assertEqual(self.app.browser.execute_script("return sessionStorage.getItem('token')"), 'abc')
+        self.assertEqual(self.app.browser.get_cookie('pyscc')['value'], 'cookie')
+        self.app.state.load({'local': {'other': '1'}}, clear=True)
+        self.assertIsNone(self.app.browser.execute_script("return localStorage.getItem('user')"))
+        self.assertIsNone(self.app.browser.get_cookie('pyscc'))
+
+    def test_state_dump(self):
+        """test captured state can be written and loaded back"""
+        self.app.state.load({'local': {'user': 'pyscc'}, 'cookies': [
+            {'name': 'pyscc', 'value': 'cookie'}]})
+        path = os.path.join(self.path, 'state.json')
+        state = self.app.state.dump(path)
+        self.assertEqual(state['local']['user'], 'pyscc')
+        self.assertIn('pyscc', [cookie['name'] for cookie in state['cookies']])
+        self.assertTrue(os.path.exists(path))
+        self.app.state.load({}, clear=True)
+        self.app.state.load(path, route='')
+        self.assertEqual(self.app.browser.execute_script("return localStorage.getItem('user')"), 'pyscc')
+        self.assertEqual(self.app.browser.get_cookie('pyscc')['value'], 'cookie')
+
+    def test_session_restore(self):
+        """test saved sessions are restored by later controllers until expired"""
+        self.app._SESSION_PATH_ = self.path
+        self.app.state.load({'local': {'user': 'pyscc'}, 'cookies': [
+            {'name': 'pyscc', 'value': 'cookie'}]})
+        self.app.navigate('profile')
+        location = self.app.location
+        path = self.app.save_session('admin')
+        self.assertEqual(path, os.path.join(self.path, 'admin.json'))
+        chrome_options = webdriver.ChromeOptions()
+        chrome_options.add_argument('--headless')
+        chrome_options.add_argument('--no-sandbox')
+        restored = self.controller(webdriver.Chrome(chrome_options=chrome_options), self.app_url,
+                                   restore_session=path, created=self.created)
+        try:
+            self.assertTrue(restored.session_restored)
+            self.assertFalse(hasattr(restored.env, 'restore_session'))
+            self.assertEqual(restored.location, location)
+            self.assertEqual(restored.browser.get_cookie('pyscc')['value'], 'cookie')
+            self.assertEqual(restored.browser.execute_script(
+                "return localStorage.getItem('user')"), 'pyscc')
+            restored._SESSION_EXPIRY_ = 0
+            self.assertFalse(restored.restore_session(path))
+            self.assertFalse(restored.restore_session(os.path.join(self.path, 'missing.json')))
+        finally:
+            restored.exit()
@@ -0,0 +1,85 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+
+from pyscc.controller import Controller
+from pyscc.stats import WaitStats
+
+
+class TestWaitStats(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.stats_path = os.path.join(self.path, 'waits.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_stats_percentiles(self):
+        """test percentiles of recorded durations, timeouts are counted apart"""
+        stats = WaitStats(self.stats_path)
+        self.assertIsNone(stats.percentile('Home[h1].wait_visible', 50))
+        for duration in range(1, 101):
+            stats.record('Home[h1].wait_visible', duration / 100.0, 10)
+        stats.record('Home[h1].wait_visible', None, 10)
+        self.assertEqual(stats.percentile('Home[h1].wait_visible', 50), 0.5)
+        self.assertEqual(stats.percentile('Home[h1].wait_visible', 99), 0.99)
+        self.assertEqual(stats.waits['Home[h1].wait_visible']['timed_out'], 1)
+
+    def test_stats_intervals(self):
+        """test polling is aggressive around the expected duration and backs off afterwards"""
+        stats = WaitStats(self.stats_path)
+        stats.record('fast', 1.0, 10)
+        intervals = stats.intervals('fast')
+        self.assertEqual([next(intervals) for _ in range(3)], [0.1] * 3)
+        unknown = stats.intervals('unknown')
+        polled = [next(unknown) for _ in range(10)]
+        self.assertEqual(polled, sorted(polled))
+        self.assertEqual(polled[-1], WaitStats._MAX_INTERVAL_)
+
+    def test_stats_report(self):
+        """test waits with timeouts far above their p99 are flagged"""
+        stats = WaitStats(self.stats_path)
+        for _ in range(10):
+            stats.record('slow', 4.0, 5)
+            stats.record('loose', 0.5, 30)
+        report = stats.report()
+        self.assertEqual([row['wait'] for row in report], ['loose'])
+        self.assertEqual(report[0]['p99'], 0.5)
+        self.assertEqual(report[0]['timeout'], 30)
+
+    def test_stats_save(self):
+        """test saved stats merge with those saved by other processes"""
+        first, second = WaitStats(self.stats_path), WaitStats(self.stats_path)
+        first.record('wait', 1.0, 5)
+        second.record('wait', 2.0, 10)
+        first.save()
+        second.save()
+        with open(self.stats_path) as saved:
+            self.assertEqual(json.load(saved)['wait'], {
+                'samples': [1.0, 2.0], 'timeout': 10, 'timed_out': 0})
+        self.assertEqual(WaitStats(self.stats_path).percentile('wait', 100), 2.0)
+        self.assertIs(WaitStats.shared(self.stats_path), WaitStats.shared(self.stats_path))
+
+    def test_controller_adaptive_wait(self):
+        """test keyed controller waits record durations and poll below a second"""
+        class StatsController(Controller):
+            _WAIT_STATS_ = self.stats_path
+
+        ready = time.time() + 0.3
+        start = time.time()
+        self.assertTrue(StatsController.wait(
+            timeout=2, condition=lambda: time.time() >= ready, key='ready'))
+        self.assertLess(time.time() - start, 0.8)
+        self.assertFalse(StatsController.wait(
+            timeout=1, condition=lambda: False, reverse=True, key='gone'))
+        self.assertTrue(StatsController.wait(
+            timeout=1, condition=lambda: True, reverse=True, key='stays'))
+        stats = WaitStats.shared(self.stats_path)
+        self.assertEqual(len(stats.waits['ready']['samples']), 1)
+        self.assertEqual(stats.waits['stays']['timed_out'], 1)
+        stats.save()
+        self.assertTrue(os.path.exists(self.stats_path))
@@ -0,0 +1,107 @@
+import json
+import threading
+from unittest import TestCase
+
+from pyscc import Controller
+from pyscc.tracer import Tracer, traced
+from tests.utils import AppController, BaseTest
+
+
+class TracedAppController(AppController):
+
+    _TRACE_ = 'target/traces/'
+
+
+class Traced(object):
+
+    selector = 'body'
+
+    @traced('test')
+    def run(self):
+        return True
+
+
+class Owned(Traced):
+
+    def __init__(self, controller):
+        self.controller = controller
+
+
+class Owner(object):
+
+    def __init__(self, name):
+        self.tracer = Tracer(name)
+
+
+class TestTracer(TestCase):
+
+    def test_tracer_inactive(self):
+        """test traced calls are not recorded without an active tracer"""
+        tracer = Tracer('inactive')
+        self.assertTrue(Traced().run())
+        self.assertEqual(tracer.events, [])
+
+    def test_tracer_spans(self):
+        """test tracer records nested spans while active"""
+        tracer = Tracer('spans').start()
+        try:
+            with tracer.span('outer', 'test'):
+                self.assertTrue(Traced().run())
+        finally:
+            tracer.stop()
+        self.assertIsNone(Tracer.current())
+        inner, outer = tracer.events
+        self.assertEqual(inner['name'], 'Traced.run')
+        self.assertEqual(inner['args'], {'selector': 'body'})
+        self.assertEqual(outer['name'], 'outer')
+        self.assertTrue(outer['ts'] <= inner['ts'])
+        self.assertTrue(inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur'])
+
+    def test_tracer_class_calls(self):
+        """test class level calls are recorded to the tracer of the current thread"""
+        tracer = Tracer('wait').start()
+        try:
+            self.assertTrue(Controller.wait(timeout=0, condition=lambda: True))
+        finally:
+            tracer.stop()
+        self.assertListEqual([event['name'] for event in tracer.events], ['Controller.wait'])
+
+    def test_tracer_threads(self):
+        """test spans are recorded to the tracer of the owning controller or current thread"""
+        owners = [Owner('first'), Owner('second')]
+        threads = [threading.Thread(target=Owned(owner).run) for owner in owners]
+        tracer = Tracer('thread')
+        threads.append(threading.Thread(target=lambda: tracer.start() and Traced().run()))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for owner in owners:
+            self.assertListEqual([event['name'] for event in owner.tracer.events], ['Owned.run'])
+        self.assertListEqual([event['name'] for event in tracer.events], ['Traced.run'])
+        self.assertIsNone(Tracer.current())
+
+
+class TestControllerTracer(BaseTest):
+
+    controller = TracedAppController
+
+    def test_controller_tracer(self):
+        """test controller records pyscc operations and webdriver commands"""
+        self.assertIs(Tracer.current(), self.app.tracer)
+        self.app.components.home.logo.check.visible()
+        names = [event['name'] for event in self.app.tracer.events]
+        self.assertIn('Check.visible', names)
+        self.assertIn('Element.get', names)
+        self.assertIn('findElement', names)
+        self.assertIn('executeScript', names)
+        self.assertTrue(self.app.wait(timeout=1, condition=lambda: True))
+        self.assertEqual(self.app.tracer.events[-1]['name'], 'Controller.wait')
+
+    def test_controller_tracer_dump(self):
+        """test controller tracer writes chrome trace event json"""
+        self.app.navigate('notfound')
+        with open(self.app.tracer.dump('target/traces/')) as trace:
+            events = json.load(trace)['traceEvents']
+        self.assertIn('Controller.navigate', [event['name'] for event in events])
+        self.assertTrue(all(event['ph'] == 'X' for event in events))
@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import numpy
+from pyscc import visual
+from tests.utils import BaseTest
+
+
+def image(color, width=40, height=30):
+    """create an image of a single color"""
+    pixels = numpy.zeros((height, width, 3), dtype=numpy.uint8)
+    pixels[:, :] = color
+    return pixels
+
+
+class TestVisual(TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_visual_compare(self):
+        """test differing pixels are found past the per channel threshold"""
+        baseline = image((200, 200, 200))
+        actual = baseline.copy()
+        actual[0:3, 0:10] = (210, 200, 200)
+        ratio, mask = visual.compare(actual, baseline)
+        self.assertAlmostEqual(ratio, 30.0 / (40 * 30))
+        self.assertTrue(mask[0, 0])
+        self.assertFalse(mask[5, 5])
+        self.assertEqual(visual.compare(actual, baseline, threshold=10)[0], 0.0)
+        self.assertEqual(visual.compare(image(0, width=20), baseline), (1.0, None))
+
+    def test_visual_ignore(self):
+        """test ignored regions are excluded from differing pixels"""
+        baseline = image((200, 200, 200))
+        actual = baseline.copy()
+        actual[0:3, 0:10] = 0
+        actual[20:25, 20:25] = 0
+        self.assertAlmostEqual(visual.compare(actual, baseline, ignore=[(0, 0, 10, 3)])[0],
+                               25.0 / (40 * 30))
+        self.assertEqual(visual.compare(actual, baseline, ignore=[
+            (0, 0, 10, 3), {'x': 20, 'y': 20, 'width': 5, 'height': 5}])[0], 0.0)
+
+    def test_visual_diff_image(self):
+        """test diff images highlight differing pixels"""
+        baseline = image((200, 200, 200))
+        actual = baseline.copy()
+        actual[0, 0] = 0
+        rendered = visual.diff_image(actual, baseline, visual.compare(actual, baseline)[1])
+        self.assertListEqual(rendered[0, 0].tolist(), [255, 0, 0])
+        self.assertNotEqual(rendered[1, 1].tolist(), [255, 0, 0])
+        self.assertEqual(visual.diff_image(image(0, width=20), baseline, None).shape, (30, 60, 3))
+
+    def test_visual_baseline_cache(self):
+        """test baselines are decoded once until written again"""
+        path = os.path.join(self.path, 'nested', 'baseline.png')
+        self.assertIsNone(visual.load_baseline(path))
+        visual.save_image(image((1, 2, 3)), path)
+        baseline = visual.load_baseline(path)
+        self.assertListEqual(baseline[0, 0].tolist(), [1, 2, 3])
+        self.assertIs(visual.load_baseline(path), baseline)
+        visual.save_image(image((4, 5, 6)), path)
+        self.assertListEqual(visual.load_baseline(path)[0, 0].tolist(), [4, 5, 6])
+
+
+class TestControllerVisual(BaseTest):
+
+    def setUp(self):
+        super(TestControllerVisual, self).setUp()
+        self.path = tempfile.mkdtemp()
+        self.app._VISUAL_BASELINES_ = os.path.join(self.path, 'baselines')
+        self.app._VISUAL_DIFFS_ = os.path.join(self.path, 'visual')
+
+    def tearDown(self):
+        super(TestControllerVisual, self).tearDown()
+        shutil.rmtree(self.path)
+
+    def test_controller_assert_visual(self):
+        """test visual checks record baselines and write diffs on failure"""
+        logo = self.app.components.home.logo
+        self.assertEqual(self.app.assert_visual('logo', logo), 0.0)
+        self.assertTrue(os.path.exists(os.path.join(self.app._VISUAL_BASELINES_, 'logo.png')))
+        self.assertEqual(self.app.assert_visual('logo', logo), 0.0)
+        logo.set_attribute('style', 'background: red')
+        with self.assertRaises(AssertionError):
+            self.app.assert_visual('logo', logo)
+        self.assertTrue(os.path.exists(os.path.join(self.app._VISUAL_DIFFS_, 'logo.diff.png')))
+        self.assertGreater(self.app.assert_visual('logo', logo, tolerance=1.0), 0)
@@ -79,6 +79,15 @@ class HomePage(Component):
         }
 
 
+class Framed(Component):
+
+    __frame__ = 'iframe#pyscc-frame'
+
+    @component_element
+    def inner(self):
+        return 'p#inner'
+
+
 class Footer(Component):
 
     @component_element
@@ -133,6 +142,8 @@ class AppController(Controller):
 
 class BaseTest(TestCase):
 
+    controller = AppController
+
     def setUp(self):
         self.app_url = 'https://riot-todo-84334.firebaseapp.com/#!/'
         self.created = time()
@@ -140,8 +151,15 @@ class BaseTest(TestCase):
         chrome_options.add_argument('--headless')
         chrome_options.add_argument('--no-gpu')
         chrome_options.add_argument('--no-sandbox')
-        self.app = AppController(
+        self.app = self.controller(
             webdriver.Chrome(chrome_options=chrome_options), self.app_url, created=self.created)
 
+    def add_frame(self, frame_id='pyscc-frame', content='<p id="inner">pyscc</p>'):
+        """append an iframe with the given content to the current document"""
+        self.app.browser.execute_script(
+            'var frame = document.createElement("iframe"); frame.id = arguments[0]; \
+            frame.srcdoc = arguments[1]; document.body.appendChild(frame);', frame_id, content)
+        self.app.wait(timeout=1)
+
     def tearDown(self):
         self.app.exit()